@@ -0,0 +1,88 @@
+"""Cold-start benchmark and regression guard for the FastAPI backend.
+
+Each run starts a fresh interpreter, imports main.py, runs the app's startup and shutdown
+(lifespan), and reports how long that took and which heavy modules got loaded:
+
+    python bench_startup.py                      # 5 runs, fails on regressions
+    python bench_startup.py --runs 10 --max-import-ms 800 --max-startup-ms 1200
+
+Exits with status 1 when the median is over budget or a lazily loaded dependency
+(scikit-learn, numpy, networkx, google-generativeai) is imported during startup.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+
+# Only needed once a request actually uses them
+LAZY_MODULES = ['sklearn', 'scipy', 'numpy', 'networkx', 'google.generativeai']
+
+PROBE = r'''
+import time, json, asyncio
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def cycle():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(cycle())
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'startup_ms': (finished - imported) * 1000,
+    'loaded': [m for m in LAZY_MODULES if m in sys.modules]
+}))
+'''
+
+
+def run_once(backend_dir: str, workdir: str) -> dict:
+    code = f"import sys\nsys.path.insert(0, {backend_dir!r})\nLAZY_MODULES = {LAZY_MODULES!r}\n{PROBE}"
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=workdir, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import and startup time")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=1000.0, help="Budget for the median import of main.py")
+    parser.add_argument('--max-startup-ms', type=float, default=500.0, help="Budget for the median lifespan startup + shutdown")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    # A scratch directory so the databases are created once, then reused like a deployed worker would
+    workdir = tempfile.mkdtemp(prefix='gaim-startup-')
+    run_once(backend_dir, workdir)
+
+    samples = [run_once(backend_dir, workdir) for _ in range(max(args.runs, 1))]
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    startup_ms = statistics.median(s['startup_ms'] for s in samples)
+    loaded = sorted({m for s in samples for m in s['loaded']})
+
+    print(f"import main:      {import_ms:8.1f} ms (median of {len(samples)}, budget {args.max_import_ms:.0f} ms)")
+    print(f"lifespan cycle:   {startup_ms:8.1f} ms (median of {len(samples)}, budget {args.max_startup_ms:.0f} ms)")
+    print(f"eager heavy deps: {', '.join(loaded) if loaded else 'none'}")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.0f} ms")
+    if startup_ms > args.max_startup_ms:
+        failures.append(f"startup took {startup_ms:.0f} ms")
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+    if failures:
+        print(f"FAIL: {'; '.join(failures)}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
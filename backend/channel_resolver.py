@@ -0,0 +1,72 @@
+import os
+import asyncio
+from typing import List, Dict, Any, Optional, Set
+
+from metrics import CACHE_LOOKUPS
+
+
+class ChannelResolver:
+    """Cache-first channel lookup: channels stored recently enough (with their recent videos) come
+    from the database, and only missing or stale IDs are fetched from the YouTube API"""
+
+    def __init__(self, youtube_api, database, writer=None, max_age_seconds: float = 24 * 3600, videos_per_channel: int = 5):
+        self.youtube_api = youtube_api
+        self.database = database
+        # Optional WriteBehindQueue for persisting freshly fetched channels
+        self.writer = writer
+        # Stored channels older than this are refetched; 0 always goes to the API
+        self.max_age_seconds = max_age_seconds
+        self.videos_per_channel = videos_per_channel
+        self._stats = {'from_database': 0, 'from_api': 0}
+
+    @classmethod
+    def from_env(cls, youtube_api, database, writer=None) -> 'ChannelResolver':
+        return cls(
+            youtube_api,
+            database,
+            writer=writer,
+            max_age_seconds=float(os.getenv('CHANNEL_CACHE_TTL_SECONDS', '86400'))
+        )
+
+    async def resolve(
+        self,
+        channel_ids: List[str],
+        max_concurrency: Optional[int] = None,
+        refreshed: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Channel details in the order of channel_ids (IDs YouTube doesn't know are dropped);
+        IDs that had to be fetched from the API are added to `refreshed` when given"""
+        unique_ids = list(dict.fromkeys(cid for cid in channel_ids if cid))
+        if not unique_ids:
+            return []
+
+        stored: Dict[str, Dict[str, Any]] = {}
+        if self.max_age_seconds > 0:
+            stored = await asyncio.to_thread(
+                self.database.get_fresh_influencers, unique_ids, self.max_age_seconds, self.videos_per_channel
+            )
+
+        missing = [cid for cid in unique_ids if cid not in stored]
+        CACHE_LOOKUPS.inc(len(stored), cache='channel', result='hit')
+        CACHE_LOOKUPS.inc(len(missing), cache='channel', result='miss')
+        fetched = await self.youtube_api.get_channels_details(missing, max_concurrency=max_concurrency) if missing else []
+        if fetched:
+            # Only API results are written back, so stored rows age out instead of being refreshed in place
+            if self.writer is not None:
+                await self.writer.enqueue_influencers(fetched)
+            else:
+                await asyncio.to_thread(self.database.save_influencers_batch, fetched)
+            # Cached campaign rankings that include these channels were built from the old rows
+            await asyncio.to_thread(self.database.invalidate_campaign_results, [c['channel_id'] for c in fetched])
+
+        if refreshed is not None:
+            refreshed.update(c['channel_id'] for c in fetched)
+
+        self._stats['from_database'] += len(stored)
+        self._stats['from_api'] += len(fetched)
+
+        by_id = {**stored, **{c['channel_id']: c for c in fetched}}
+        return [by_id[cid] for cid in unique_ids if cid in by_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'max_age_seconds': self.max_age_seconds}
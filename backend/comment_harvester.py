@@ -0,0 +1,205 @@
+import os
+import math
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
+
+from quota import QuotaExceededError
+
+
+class CommentHarvester:
+    """Bounded-concurrency pipeline that pulls comments for channels' recent videos,
+    streams them into the database in batches and aggregates per-channel comment signals.
+
+    Every harvest samples a video's newest comments (order='time'). Videos harvested before only
+    fetch comments newer than the newest stored one and top the sample up with stored ones, so a
+    channel is scored on the same kind of sample whether or not it was seen before.
+    """
+
+    def __init__(
+        self,
+        youtube_api,
+        database,
+        writer=None,
+        concurrency: int = 4,
+        batch_size: int = 500,
+        queue_size: int = 8
+    ):
+        self.youtube_api = youtube_api
+        self.database = database
+        # Optional WriteBehindQueue; without one, batches are written directly off the event loop
+        self.writer = writer
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = batch_size
+        # Fetchers block once this many videos' comments are waiting to be written (backpressure)
+        self.queue_size = queue_size
+
+    @classmethod
+    def from_env(cls, youtube_api, database, writer=None) -> 'CommentHarvester':
+        return cls(
+            youtube_api,
+            database,
+            writer=writer,
+            concurrency=int(os.getenv('COMMENT_HARVEST_CONCURRENCY', '4')),
+            batch_size=int(os.getenv('COMMENT_HARVEST_BATCH_SIZE', '500')),
+            queue_size=int(os.getenv('COMMENT_HARVEST_QUEUE_SIZE', '8'))
+        )
+
+    async def harvest(
+        self,
+        channels: List[Dict[str, Any]],
+        videos_per_channel: int,
+        comments_per_video: int,
+        brand_keywords: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Harvest comments and return {channel_id: signals}.
+
+        Stops early (keeping partial signals) when the quota runs out; cancelling the
+        caller cancels the fetchers and flushes whatever was already fetched.
+        """
+        jobs: List[Tuple[str, str]] = []
+        for channel in channels:
+            channel_id = channel.get('channel_id')
+            if not channel_id:
+                continue
+            for video in (channel.get('recent_videos') or [])[:videos_per_channel]:
+                if video.get('video_id') and video.get('comment_count', 1) != 0:
+                    jobs.append((channel_id, video['video_id']))
+
+        signals: Dict[str, Dict[str, Any]] = {
+            channel.get('channel_id'): self._empty_signals()
+            for channel in channels if channel.get('channel_id')
+        }
+        if not jobs or comments_per_video <= 0:
+            return self._finalize(signals, comments_per_video)
+
+        keywords = [k.lower() for k in (brand_keywords or []) if k]
+        watermarks = await asyncio.to_thread(self.database.get_comment_watermarks, [video_id for _, video_id in jobs])
+        job_queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            job_queue.put_nowait(job)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        quota_exhausted = asyncio.Event()
+
+        async def fetcher():
+            while not quota_exhausted.is_set():
+                try:
+                    channel_id, video_id = job_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                since = watermarks.get(video_id)
+                comments: List[Dict[str, Any]] = []
+                try:
+                    async for comment in self.youtube_api.iter_video_comments(
+                        video_id, max_results=comments_per_video, order='time', since=since
+                    ):
+                        comments.append(comment)
+                except QuotaExceededError:
+                    quota_exhausted.set()
+                except Exception as e:
+                    # Comments disabled, deleted video, etc.
+                    print(f"Error harvesting comments for video {video_id}: {e}")
+                sample = comments
+                if since is not None and len(comments) < comments_per_video:
+                    # Top up the signal sample with what earlier harvests stored
+                    stored = await asyncio.to_thread(self.database.get_video_comments, video_id, comments_per_video)
+                    sample = self._merge_sample(comments, stored, comments_per_video)
+                if sample:
+                    await results.put((channel_id, video_id, comments, sample))
+
+        async def writer():
+            batch: Dict[str, List[Dict[str, Any]]] = {}
+            pending = 0
+            try:
+                while True:
+                    item = await results.get()
+                    if item is None:
+                        break
+                    channel_id, video_id, comments, sample = item
+                    self._accumulate(signals.setdefault(channel_id, self._empty_signals()), sample, keywords)
+                    if not comments:
+                        continue
+                    batch.setdefault(video_id, []).extend(comments)
+                    pending += len(comments)
+                    if pending >= self.batch_size:
+                        await self._store(batch)
+                        batch, pending = {}, 0
+            finally:
+                if batch:
+                    await self._store(batch)
+
+        writer_task = asyncio.ensure_future(writer())
+        fetchers = [asyncio.ensure_future(fetcher()) for _ in range(min(self.concurrency, len(jobs)))]
+        try:
+            await asyncio.gather(*fetchers)
+        finally:
+            for task in fetchers:
+                task.cancel()
+            await asyncio.gather(*fetchers, return_exceptions=True)
+            # Let the writer drain what was fetched, then stop it
+            await results.put(None)
+            await writer_task
+
+        result = self._finalize(signals, comments_per_video)
+        if quota_exhausted.is_set():
+            for channel_signals in result.values():
+                channel_signals['partial'] = True
+        return result
+
+    async def _store(self, batch: Dict[str, List[Dict[str, Any]]]):
+        if self.writer is not None:
+            await self.writer.enqueue_comments(batch)
+        else:
+            await asyncio.to_thread(self.database.save_comments_batch, batch)
+
+    @staticmethod
+    def _merge_sample(fetched: List[Dict[str, Any]], stored: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """Fetched comments plus stored ones not among them, up to limit (both are newest first,
+        and everything fetched is newer than what was stored)"""
+        seen = {c.get('comment_id') for c in fetched}
+        merged = list(fetched)
+        for comment in stored:
+            if len(merged) >= limit:
+                break
+            if comment.get('comment_id') not in seen:
+                merged.append(comment)
+        return merged
+
+    @staticmethod
+    def _empty_signals() -> Dict[str, Any]:
+        return {'videos': 0, 'comments': 0, 'likes': 0, 'keyword_mentions': 0, 'authors': set()}
+
+    @staticmethod
+    def _accumulate(channel_signals: Dict[str, Any], comments: List[Dict[str, Any]], keywords: List[str]):
+        channel_signals['videos'] += 1
+        for comment in comments:
+            channel_signals['comments'] += 1
+            channel_signals['likes'] += comment.get('like_count', 0)
+            text = (comment.get('text') or '').lower()
+            if keywords and any(k in text for k in keywords):
+                channel_signals['keyword_mentions'] += 1
+            if comment.get('author_channel_id'):
+                channel_signals['authors'].add(comment['author_channel_id'])
+
+    @staticmethod
+    def _finalize(signals: Dict[str, Dict[str, Any]], comments_per_video: int) -> Dict[str, Dict[str, Any]]:
+        """Turn raw counters into 0-1 scores"""
+        finalized = {}
+        for channel_id, raw in signals.items():
+            comments = raw['comments']
+            videos = raw['videos']
+            # How close each video came to the requested comment sample size
+            volume = min(comments / (videos * comments_per_video), 1.0) if videos and comments_per_video else 0.0
+            relevance = raw['keyword_mentions'] / comments if comments else 0.0
+            avg_likes = raw['likes'] / comments if comments else 0.0
+            appreciation = min(math.log10(1 + avg_likes) / 2, 1.0)
+            diversity = len(raw['authors']) / comments if comments else 0.0
+
+            finalized[channel_id] = {
+                'videos_sampled': videos,
+                'comments_sampled': comments,
+                'keyword_mention_rate': round(relevance, 4),
+                'avg_comment_likes': round(avg_likes, 2),
+                'unique_commenter_ratio': round(diversity, 4),
+                'comment_score': round(0.4 * volume + 0.4 * relevance + 0.2 * appreciation, 4),
+            }
+        return finalized
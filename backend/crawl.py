@@ -0,0 +1,305 @@
+"""Offline crawler that warms the influencer database ahead of user requests.
+
+Searches each keyword, stores the videos, channels (with their recent uploads) and a sample of
+comments, and stops once the run's quota budget is spent. Progress is checkpointed after every
+keyword, so rerunning the same command resumes where the last run stopped:
+
+    python crawl.py "vegan recipes" "home workout" --budget 3000
+    python crawl.py --keywords-file keywords.txt --concurrency 4 --checkpoint crawl_checkpoint.json
+    python crawl.py --keywords-file categories.txt --expand 10   # categories -> Gemini keywords
+
+Delete the checkpoint file to crawl everything again. The crawl runs at background priority,
+so with GAIM_SHARED_STATE_PATH set it never touches the quota reserved for interactive requests.
+"""
+import os
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from youtube_api import YouTubeAPI
+from database import Database
+from write_behind import WriteBehindQueue
+from channel_resolver import ChannelResolver
+from comment_harvester import CommentHarvester
+from response_cache import ResponseCache
+from shared_state import SharedState
+from quota import QuotaScheduler, QuotaExceededError, APIKeyPool, quota_scope, BACKGROUND
+
+
+class CrawlQuota(QuotaScheduler):
+    """QuotaScheduler that also stops once a single crawl run has spent run_budget units"""
+
+    def __init__(self, *args, run_budget: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.run_budget = run_budget
+        self.run_used = 0
+
+    async def acquire(self, endpoint: str) -> int:
+        cost = self.cost_of(endpoint)
+        if self.run_budget is not None and self.run_used + cost > self.run_budget:
+            raise QuotaExceededError(
+                f"quotaExceeded: crawl budget exhausted ({self.run_used}/{self.run_budget} units used, {endpoint} costs {cost})"
+            )
+        # Counted before awaiting so concurrent workers cannot overshoot the run budget
+        self.run_used += cost
+        try:
+            return await super().acquire(endpoint)
+        except BaseException:
+            self.run_used -= cost
+            raise
+
+    async def refund(self, endpoint: str):
+        await super().refund(endpoint)
+        self.run_used = max(self.run_used - self.cost_of(endpoint), 0)
+
+
+class Checkpoint:
+    """Crawl progress in a JSON file, rewritten atomically after each keyword"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Any] = {'keywords': {}, 'expanded': {}, 'harvested_channels': [], 'quota_used': 0}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.data.update(json.load(f))
+        self.harvested: Set[str] = set(self.data['harvested_channels'])
+
+    def keyword(self, keyword: str) -> Dict[str, Any]:
+        return self.data['keywords'].get(keyword, {'status': 'pending'})
+
+    def mark(self, keyword: str, status: str, channel_ids: Optional[List[str]] = None):
+        entry = self.data['keywords'].setdefault(keyword, {})
+        entry['status'] = status
+        if channel_ids is not None:
+            entry['channel_ids'] = channel_ids
+
+    def save(self):
+        self.data['harvested_channels'] = sorted(self.harvested)
+        self.data['updated_at'] = datetime.now().isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        # A crash mid-write leaves the previous checkpoint intact
+        os.replace(tmp_path, self.path)
+
+
+class Crawler:
+    """Bounded-concurrency keyword crawl: search -> channels -> comments, checkpointed per keyword"""
+
+    def __init__(
+        self,
+        youtube_api: YouTubeAPI,
+        database: Database,
+        writer: WriteBehindQueue,
+        checkpoint: Checkpoint,
+        videos_per_keyword: int = 50,
+        videos_per_channel: int = 3,
+        comments_per_video: int = 20,
+        concurrency: int = 4,
+        order: str = 'viewCount',
+        region_code: str = 'IN',
+        language: str = 'English',
+        channel_max_age: Optional[float] = None
+    ):
+        self.youtube_api = youtube_api
+        self.database = database
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.videos_per_keyword = videos_per_keyword
+        self.videos_per_channel = videos_per_channel
+        self.comments_per_video = comments_per_video
+        self.concurrency = max(concurrency, 1)
+        self.search_params = {'order': order, 'region_code': region_code, 'language': language}
+
+        self.resolver = ChannelResolver.from_env(youtube_api, database, writer=writer)
+        if channel_max_age is not None:
+            self.resolver.max_age_seconds = channel_max_age
+        self.harvester = CommentHarvester.from_env(youtube_api, database, writer=writer)
+        # Channels fetched from the API this run (the resolver drops their cached campaign rankings)
+        self.refreshed: Set[str] = set()
+        self.quota_exhausted = False
+
+    async def run(self, keywords: List[str]) -> Dict[str, Any]:
+        pending = [kw for kw in keywords if self.checkpoint.keyword(kw)['status'] != 'done']
+        queue: asyncio.Queue = asyncio.Queue()
+        for keyword in pending:
+            queue.put_nowait(keyword)
+
+        async def worker():
+            while not self.quota_exhausted:
+                try:
+                    keyword = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self.crawl_keyword(keyword)
+                except QuotaExceededError as e:
+                    print(f"Stopping: {e}")
+                    self.quota_exhausted = True
+                except Exception as e:
+                    # Left unfinished in the checkpoint, so the next run retries it
+                    print(f"Error crawling '{keyword}': {e}")
+
+        with quota_scope(BACKGROUND) as usage:
+            try:
+                await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(pending)) or 1)])
+            finally:
+                await self.writer.flush()
+                self.checkpoint.data['quota_used'] += usage['units']
+                self.checkpoint.save()
+
+        return {
+            'keywords_total': len(keywords),
+            'keywords_done': sum(1 for kw in keywords if self.checkpoint.keyword(kw)['status'] == 'done'),
+            'channels_refreshed': len(self.refreshed),
+            'quota_used': usage['units'],
+            'quota_used_all_runs': self.checkpoint.data['quota_used'],
+            'quota_exhausted': self.quota_exhausted
+        }
+
+    async def persist(self):
+        """Flush buffered writes; raises if they failed, so the checkpoint never moves past data
+        that is not in the database"""
+        if not await self.writer.flush():
+            raise RuntimeError(f"database write failed ({self.writer.pending} records still buffered)")
+
+    async def crawl_keyword(self, keyword: str):
+        state = self.checkpoint.keyword(keyword)
+        channel_ids = state.get('channel_ids')
+
+        if state['status'] != 'searched':
+            videos_by_channel: Dict[str, List[Dict[str, Any]]] = {}
+            async for video in self.youtube_api.iter_search_videos(
+                keyword, max_results=self.videos_per_keyword, **self.search_params
+            ):
+                if video.get('channel_id'):
+                    videos_by_channel.setdefault(video['channel_id'], []).append(video)
+            for channel_id, videos in videos_by_channel.items():
+                await self.writer.enqueue_videos(channel_id, videos)
+            await self.persist()
+            channel_ids = list(videos_by_channel)
+            self.checkpoint.mark(keyword, 'searched', channel_ids)
+            self.checkpoint.save()
+
+        channels = await self.resolver.resolve(channel_ids or [], refreshed=self.refreshed)
+
+        to_harvest = [c for c in channels if c['channel_id'] not in self.checkpoint.harvested]
+        if to_harvest and self.comments_per_video > 0:
+            signals = await self.harvester.harvest(to_harvest, self.videos_per_channel, self.comments_per_video)
+            if any(s.get('partial') for s in signals.values()):
+                # Keep what was fetched; the keyword stays unfinished either way
+                await self.writer.flush()
+                raise QuotaExceededError(f"quotaExceeded: budget ran out while harvesting comments for '{keyword}'")
+
+        await self.persist()
+        self.checkpoint.harvested.update(c['channel_id'] for c in to_harvest)
+        self.checkpoint.mark(keyword, 'done')
+        self.checkpoint.save()
+        print(f"Crawled '{keyword}': {len(channels)} channels")
+
+
+async def expand_categories(categories: List[str], checkpoint: Checkpoint, per_category: int) -> List[str]:
+    """Turn categories into search keywords with Gemini (remembered in the checkpoint)"""
+    from llm import KeywordLLM
+
+    llm = KeywordLLM(api_key=os.getenv("GEMINI_API_KEY"))
+    keywords: List[str] = []
+    for category in categories:
+        expanded = checkpoint.data['expanded'].get(category)
+        if expanded is None:
+            expanded = await asyncio.to_thread(llm.expand_keywords, category, [category], per_category)
+            if not expanded:
+                print(f"No expansion for '{category}' (is GEMINI_API_KEY set?); searching it as-is")
+                expanded = [category]
+            checkpoint.data['expanded'][category] = expanded
+        keywords.extend(expanded)
+    checkpoint.save()
+    return list(dict.fromkeys(keywords))
+
+
+def read_keywords(args) -> List[str]:
+    keywords = list(args.keywords)
+    if args.keywords_file:
+        with open(args.keywords_file, encoding='utf-8') as f:
+            keywords.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith('#'))
+    return list(dict.fromkeys(keywords))
+
+
+async def crawl(args) -> Dict[str, Any]:
+    checkpoint = Checkpoint(args.checkpoint)
+    keywords = read_keywords(args)
+    if args.expand:
+        keywords = await expand_categories(keywords, checkpoint, args.expand)
+
+    shared_state = SharedState.from_env()
+    key_pool = APIKeyPool.from_env(shared=shared_state)
+    quota = CrawlQuota.from_env(key_count=len(key_pool), shared=shared_state)
+    quota.run_budget = args.budget
+    youtube_api = YouTubeAPI(api_key=key_pool, cache=ResponseCache.from_env(), quota=quota)
+    database = Database.from_env(args.db)
+    writer = WriteBehindQueue.from_env(database)
+
+    crawler = Crawler(
+        youtube_api,
+        database,
+        writer,
+        checkpoint,
+        videos_per_keyword=args.videos_per_keyword,
+        videos_per_channel=args.videos_per_channel,
+        comments_per_video=args.comments_per_video,
+        concurrency=args.concurrency,
+        order=args.order,
+        region_code=args.region,
+        language=args.language,
+        channel_max_age=0 if args.refresh else None
+    )
+
+    await youtube_api.open()
+    writer.start()
+    try:
+        return await crawler.run(keywords)
+    finally:
+        await writer.stop()
+        await youtube_api.close()
+        database.close()
+        if youtube_api.cache is not None:
+            await asyncio.to_thread(youtube_api.cache.purge_expired)
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Pre-populate the influencer database from keyword searches")
+    parser.add_argument('keywords', nargs='*', help="Keywords (or categories with --expand) to crawl")
+    parser.add_argument('--keywords-file', help="File with one keyword per line ('#' starts a comment)")
+    parser.add_argument('--expand', type=int, default=0, metavar='N',
+                        help="Treat inputs as categories and expand each into N keywords with Gemini")
+    parser.add_argument('--budget', type=int, default=2000, help="YouTube quota units this run may spend")
+    parser.add_argument('--videos-per-keyword', type=int, default=50)
+    parser.add_argument('--videos-per-channel', type=int, default=3, help="Recent videos per channel to sample comments from")
+    parser.add_argument('--comments-per-video', type=int, default=20, help="0 skips comments")
+    parser.add_argument('--concurrency', type=int, default=4, help="Keywords crawled at once")
+    parser.add_argument('--order', default='viewCount')
+    parser.add_argument('--region', default='IN')
+    parser.add_argument('--language', default='English')
+    parser.add_argument('--refresh', action='store_true', help="Refetch channels even if they were stored recently")
+    parser.add_argument('--checkpoint', default='crawl_checkpoint.json')
+    parser.add_argument('--db', help="Database file (default: DATABASE_PATH, else gaim_database.db)")
+    args = parser.parse_args()
+
+    if not args.keywords and not args.keywords_file:
+        parser.error("give keywords or --keywords-file")
+
+    try:
+        summary = asyncio.run(crawl(args))
+    except KeyboardInterrupt:
+        print(f"Interrupted; progress saved to {args.checkpoint}")
+        return
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
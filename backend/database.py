@@ -1,22 +1,191 @@
 import sqlite3
 import json
+import threading
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 
 
+# Stored in PRAGMA user_version; bump it whenever the tables or migrations in init_database change
+SCHEMA_VERSION = 2
+
+# Upserts update rows in place (unlike INSERT OR REPLACE, which deletes and re-inserts),
+# so created_at keeps the time a record was first stored
+UPSERT_INFLUENCER_SQL = '''
+    INSERT INTO influencers (
+        channel_id, platform, title, description, subscriber_count,
+        video_count, view_count, country, custom_url, thumbnail,
+        keywords, topic_categories, engagement_rate, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (channel_id) DO UPDATE SET
+        platform = excluded.platform,
+        title = excluded.title,
+        description = excluded.description,
+        subscriber_count = excluded.subscriber_count,
+        video_count = excluded.video_count,
+        view_count = excluded.view_count,
+        country = excluded.country,
+        custom_url = excluded.custom_url,
+        thumbnail = excluded.thumbnail,
+        keywords = excluded.keywords,
+        topic_categories = excluded.topic_categories,
+        engagement_rate = excluded.engagement_rate,
+        last_updated = excluded.last_updated
+'''
+
+UPSERT_VIDEO_SQL = '''
+    INSERT INTO videos (
+        video_id, channel_id, title, description,
+        view_count, like_count, comment_count,
+        published_at, thumbnail
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (video_id) DO UPDATE SET
+        channel_id = excluded.channel_id,
+        title = excluded.title,
+        description = excluded.description,
+        view_count = excluded.view_count,
+        like_count = excluded.like_count,
+        comment_count = excluded.comment_count,
+        published_at = excluded.published_at,
+        thumbnail = excluded.thumbnail
+'''
+
+# Comments are keyed by their YouTube comment ID, so re-harvesting a video updates rows instead of adding them
+COMMENTS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS comments (
+        comment_id TEXT PRIMARY KEY,
+        video_id TEXT,
+        author TEXT,
+        author_channel_id TEXT,
+        text TEXT,
+        like_count INTEGER,
+        published_at TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (video_id) REFERENCES videos(video_id)
+    )
+'''
+
+UPSERT_COMMENT_SQL = '''
+    INSERT INTO comments (
+        comment_id, video_id, author, author_channel_id, text, like_count, published_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (comment_id) DO UPDATE SET
+        author = excluded.author,
+        author_channel_id = excluded.author_channel_id,
+        text = excluded.text,
+        like_count = excluded.like_count
+'''
+
+
+def comment_key(video_id: str, comment: Dict[str, Any]) -> str:
+    """Primary key for a comment: its YouTube ID, or a stable fallback for comments without one
+    (e.g. recordings made before IDs were requested)"""
+    return comment.get('comment_id') or (
+        f"{video_id}:{comment.get('author_channel_id', '')}:{comment.get('published_at', '')}"
+    )
+
+
 class Database:
-    """SQLite database for caching influencer data"""
+    """SQLite database for caching influencer data.
+
+    Each thread (the event loop and the asyncio.to_thread workers) keeps one tuned connection
+    for the life of the Database instead of reconnecting on every call.
+    """
     
-    def __init__(self, db_path: str = "gaim_database.db"):
+    def __init__(
+        self,
+        db_path: str = "gaim_database.db",
+        busy_timeout: float = 10.0,
+        mmap_size_mb: int = 256,
+        cache_size_mb: int = 64,
+        cached_statements: int = 256
+    ):
         self.db_path = db_path
+        # Seconds a writer waits for another connection's transaction before failing
+        self.busy_timeout = busy_timeout
+        self.mmap_size_mb = mmap_size_mb
+        self.cache_size_mb = cache_size_mb
+        # Prepared statements kept per connection
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self.init_database()
     
+    @classmethod
+    def from_env(cls, db_path: Optional[str] = None) -> 'Database':
+        """An explicit db_path wins over DATABASE_PATH"""
+        return cls(
+            db_path or os.getenv('DATABASE_PATH', 'gaim_database.db'),
+            busy_timeout=float(os.getenv('DB_BUSY_TIMEOUT', '10')),
+            mmap_size_mb=int(os.getenv('DB_MMAP_SIZE_MB', '256')),
+            cache_size_mb=int(os.getenv('DB_CACHE_SIZE_MB', '64')),
+            cached_statements=int(os.getenv('DB_CACHED_STATEMENTS', '256'))
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened and tuned on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread is off only so close() can run from another thread at shutdown
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                cached_statements=self.cached_statements,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            # WAL so readers (here and in other worker processes) don't block the writer
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Durable across application crashes; only a power loss can drop the last commits
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA mmap_size={self.mmap_size_mb * 1024 * 1024}')
+            # Negative values are KiB
+            conn.execute(f'PRAGMA cache_size=-{self.cache_size_mb * 1024}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close every thread's connection (call once on shutdown)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print(f"Error closing database connection: {e}")
+        self._local = threading.local()
+    
     def init_database(self):
-        """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        """Initialize database with required tables (skipped when the file is already at SCHEMA_VERSION)"""
+        conn = self._connection()
         cursor = conn.cursor()
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
         
+        # Several worker processes may open an old file at once: take the write lock first, then
+        # re-check, so only one of them migrates and the others see the finished schema
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] >= SCHEMA_VERSION:
+                conn.rollback()
+                return
+            self._create_schema(cursor)
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    def _create_schema(self, cursor):
+        """Create or migrate every table; runs inside init_database's BEGIN IMMEDIATE transaction"""
         # Influencers table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS influencers (
@@ -55,19 +224,8 @@ class Database:
         ''')
 
         # Comments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                video_id TEXT,
-                author TEXT,
-                author_channel_id TEXT,
-                text TEXT,
-                like_count INTEGER,
-                published_at TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (video_id) REFERENCES videos(video_id)
-            )
-        ''')
+        self._migrate_comments(cursor)
+        cursor.execute(COMMENTS_TABLE_SQL)
         
         # Network edges table
         cursor.execute('''
@@ -99,6 +257,8 @@ class Database:
             )
         ''')
         
+        self._migrate_brand_matches(cursor)
+        
         # Create indexes for better performance
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_influencers_subscribers 
@@ -112,9 +272,10 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_videos_channel 
             ON videos(channel_id)
         ''')
+        # Also serves the per-video newest-comment watermark (MAX(published_at))
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_comments_video 
-            ON comments(video_id)
+            CREATE INDEX IF NOT EXISTS idx_comments_video_published 
+            ON comments(video_id, published_at)
         ''')
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_edges_source 
@@ -124,120 +285,213 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_edges_target 
             ON network_edges(target_id)
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_brand_matches_fingerprint 
+            ON brand_matches(fingerprint, rank)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_brand_matches_channel 
+            ON brand_matches(channel_id)
+        ''')
+    
+    @staticmethod
+    def _migrate_brand_matches(cursor):
+        """Add the campaign-cache columns to brand_matches tables created by older versions"""
+        cursor.execute('PRAGMA table_info(brand_matches)')
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in (('fingerprint', 'TEXT'), ('rank', 'INTEGER'), ('result', 'TEXT'), ('meta', 'TEXT')):
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE brand_matches ADD COLUMN {column} {column_type}')
+    
+    @staticmethod
+    def _migrate_comments(cursor):
+        """Rebuild a comments table from older versions (autoincrement key) keyed by comment ID,
+        collapsing the duplicate rows that repeated harvests left behind"""
+        cursor.execute('PRAGMA table_info(comments)')
+        existing = {row[1] for row in cursor.fetchall()}
+        if not existing or 'comment_id' in existing:
+            return
+        # Committed together with the rest of init_database, so a failure leaves the old table intact
+        cursor.execute('ALTER TABLE comments RENAME TO comments_legacy')
+        cursor.execute(COMMENTS_TABLE_SQL)
+        # Old rows have no YouTube ID; keep one per distinct comment under a synthetic key
+        cursor.execute('''
+            INSERT INTO comments (
+                comment_id, video_id, author, author_channel_id, text, like_count, published_at, created_at
+            )
+            SELECT 'legacy:' || MIN(id), video_id, author, author_channel_id, text,
+                   MAX(like_count), published_at, MIN(created_at)
+            FROM comments_legacy
+            GROUP BY video_id, author, author_channel_id, text, published_at
+        ''')
+        cursor.execute('DROP TABLE comments_legacy')
+    
+    @staticmethod
+    def _influencer_row(channel_data: Dict[str, Any]) -> tuple:
+        # Calculate engagement rate
+        subscriber_count = channel_data.get('subscriber_count', 0)
+        view_count = channel_data.get('view_count', 0)
+        engagement_rate = (view_count / subscriber_count) if subscriber_count > 0 else 0
         
-        conn.commit()
-        conn.close()
+        return (
+            channel_data.get('channel_id', ''),
+            'youtube',
+            channel_data.get('title', ''),
+            channel_data.get('description', ''),
+            subscriber_count,
+            channel_data.get('video_count', 0),
+            view_count,
+            channel_data.get('country', ''),
+            channel_data.get('custom_url', ''),
+            channel_data.get('thumbnail', ''),
+            json.dumps(channel_data.get('keywords', [])),
+            json.dumps(channel_data.get('topic_categories', [])),
+            engagement_rate,
+            datetime.now().isoformat()
+        )
+    
+    @staticmethod
+    def _video_row(channel_id: str, video: Dict[str, Any]) -> tuple:
+        return (
+            video.get('video_id', ''),
+            channel_id,
+            video.get('title', ''),
+            video.get('description', ''),
+            video.get('view_count', 0),
+            video.get('like_count', 0),
+            video.get('comment_count', 0),
+            video.get('published_at', ''),
+            video.get('thumbnail', '')
+        )
+    
+    @staticmethod
+    def _comment_row(video_id: str, comment: Dict[str, Any]) -> tuple:
+        return (
+            comment_key(video_id, comment),
+            video_id,
+            comment.get('author', ''),
+            comment.get('author_channel_id', ''),
+            comment.get('text', ''),
+            comment.get('like_count', 0),
+            comment.get('published_at', '')
+        )
+    
+    @staticmethod
+    def _upsert_rows(conn: sqlite3.Connection, table: str, key_column: str, sql: str, rows: List[tuple]) -> Dict[str, int]:
+        """executemany an upsert whose rows start with the key; returns {'inserted', 'updated'}"""
+        # The last row per key wins, as it would if the rows were applied one by one
+        rows = list({row[0]: row for row in rows}.values())
+        keys = [row[0] for row in rows]
+        existing = 0
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i+500]
+            placeholders = ','.join('?' * len(chunk))
+            existing += conn.execute(
+                f'SELECT COUNT(*) FROM {table} WHERE {key_column} IN ({placeholders})', chunk
+            ).fetchone()[0]
+        conn.executemany(sql, rows)
+        return {'inserted': len(rows) - existing, 'updated': existing}
+    
+    def upsert_batch(
+        self,
+        influencers: List[Dict[str, Any]],
+        videos: List[tuple],
+        comments: List[tuple]
+    ) -> Dict[str, Dict[str, int]]:
+        """Upsert influencers, (channel_id, video) pairs and (video_id, comment) pairs in one
+        transaction; returns per-table {'inserted', 'updated'} counts and raises if the write fails"""
+        with self._connection() as conn:
+            # Take the write lock up front so the existing-row counts match what the upsert sees
+            conn.execute('BEGIN IMMEDIATE')
+            counts = {
+                'influencers': self._upsert_rows(
+                    conn, 'influencers', 'channel_id', UPSERT_INFLUENCER_SQL,
+                    [self._influencer_row(c) for c in influencers]
+                ),
+                'videos': self._upsert_rows(
+                    conn, 'videos', 'video_id', UPSERT_VIDEO_SQL,
+                    [self._video_row(cid, v) for cid, v in videos]
+                ),
+                'comments': self._upsert_rows(
+                    conn, 'comments', 'comment_id', UPSERT_COMMENT_SQL,
+                    [self._comment_row(vid, c) for vid, c in comments]
+                )
+            }
+        return counts
     
     def save_influencer(self, channel_data: Dict[str, Any]) -> bool:
         """Save or update influencer data"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Calculate engagement rate
-            subscriber_count = channel_data.get('subscriber_count', 0)
-            view_count = channel_data.get('view_count', 0)
-            engagement_rate = (view_count / subscriber_count) if subscriber_count > 0 else 0
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO influencers (
-                    channel_id, platform, title, description, subscriber_count,
-                    video_count, view_count, country, custom_url, thumbnail,
-                    keywords, topic_categories, engagement_rate, last_updated
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                channel_data.get('channel_id', ''),
-                'youtube',
-                channel_data.get('title', ''),
-                channel_data.get('description', ''),
-                subscriber_count,
-                channel_data.get('video_count', 0),
-                view_count,
-                channel_data.get('country', ''),
-                channel_data.get('custom_url', ''),
-                channel_data.get('thumbnail', ''),
-                json.dumps(channel_data.get('keywords', [])),
-                json.dumps(channel_data.get('topic_categories', [])),
-                engagement_rate,
-                datetime.now().isoformat()
-            ))
-            
-            conn.commit()
-            conn.close()
+            # The connection's context manager commits, or rolls back if the block raises
+            with self._connection() as conn:
+                conn.execute(UPSERT_INFLUENCER_SQL, self._influencer_row(channel_data))
             return True
         except Exception as e:
             print(f"Error saving influencer: {e}")
             return False
     
-    def save_influencers_batch(self, channels_data: List[Dict[str, Any]]) -> int:
-        """Save multiple influencers in batch"""
-        saved_count = 0
-        for channel in channels_data:
-            if self.save_influencer(channel):
-                saved_count += 1
-                # Save videos too
-                self.save_videos(channel.get('channel_id', ''), channel.get('recent_videos', []))
-        return saved_count
+    def save_influencers_batch(self, channels_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """Upsert influencers and their recent_videos in one transaction; returns inserted/updated counts"""
+        channels = [c for c in channels_data if c.get('channel_id')]
+        videos = [
+            (channel['channel_id'], video)
+            for channel in channels
+            for video in channel.get('recent_videos') or []
+            if video.get('video_id')
+        ]
+        try:
+            return self.upsert_batch(channels, videos, [])
+        except Exception as e:
+            print(f"Error saving influencers batch: {e}")
+            return {}
     
     def save_videos(self, channel_id: str, videos: List[Dict[str, Any]]):
         """Save videos for a channel"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for video in videos:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO videos (
-                        video_id, channel_id, title, description,
-                        view_count, like_count, comment_count,
-                        published_at, thumbnail
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    video.get('video_id', ''),
-                    channel_id,
-                    video.get('title', ''),
-                    video.get('description', ''),
-                    video.get('view_count', 0),
-                    video.get('like_count', 0),
-                    video.get('comment_count', 0),
-                    video.get('published_at', ''),
-                    video.get('thumbnail', '')
-                ))
-            
-            conn.commit()
-            conn.close()
+            with self._connection() as conn:
+                conn.executemany(UPSERT_VIDEO_SQL, [self._video_row(channel_id, video) for video in videos])
         except Exception as e:
             print(f"Error saving videos: {e}")
 
     def save_comments(self, video_id: str, comments: List[Dict[str, Any]]):
         """Save comments for a video"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            for comment in comments:
-                cursor.execute('''
-                    INSERT INTO comments (
-                        video_id, author, author_channel_id, text, like_count, published_at
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    video_id,
-                    comment.get('author', ''),
-                    comment.get('author_channel_id', ''),
-                    comment.get('text', ''),
-                    comment.get('like_count', 0),
-                    comment.get('published_at', '')
-                ))
-            conn.commit()
-            conn.close()
+            with self._connection() as conn:
+                conn.executemany(UPSERT_COMMENT_SQL, [self._comment_row(video_id, comment) for comment in comments])
         except Exception as e:
             print(f"Error saving comments: {e}")
+
+    def save_comments_batch(self, comments_by_video: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Upsert comments for many videos in a single transaction; returns how many were new"""
+        pairs = [
+            (video_id, comment)
+            for video_id, comments in comments_by_video.items()
+            for comment in comments
+        ]
+        try:
+            return self.upsert_batch([], [], pairs)['comments']['inserted']
+        except Exception as e:
+            print(f"Error saving comments batch: {e}")
+            return 0
+    
+    def write_batch(
+        self,
+        influencers: List[Dict[str, Any]],
+        videos: List[tuple],
+        comments: List[tuple]
+    ) -> Optional[Dict[str, Dict[str, int]]]:
+        """upsert_batch that logs failures instead of raising; returns the counts, or None on error"""
+        try:
+            return self.upsert_batch(influencers, videos, comments)
+        except Exception as e:
+            print(f"Error writing batch: {e}")
+            return None
     
     def get_influencer(self, channel_id: str) -> Optional[Dict[str, Any]]:
         """Get influencer by channel ID"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._connection().cursor()
             
             cursor.execute('SELECT * FROM influencers WHERE channel_id = ?', (channel_id,))
             row = cursor.fetchone()
@@ -249,10 +503,8 @@ class Database:
                 data['topic_categories'] = json.loads(data.get('topic_categories', '[]'))
                 # Get videos
                 data['recent_videos'] = self.get_channel_videos(channel_id)
-                conn.close()
                 return data
             
-            conn.close()
             return None
         except Exception as e:
             print(f"Error getting influencer: {e}")
@@ -261,9 +513,7 @@ class Database:
     def get_channel_videos(self, channel_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get videos for a channel"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._connection().cursor()
             
             cursor.execute('''
                 SELECT * FROM videos 
@@ -273,12 +523,95 @@ class Database:
             ''', (channel_id, limit))
             
             videos = [dict(row) for row in cursor.fetchall()]
-            conn.close()
             return videos
         except Exception as e:
             print(f"Error getting videos: {e}")
             return []
     
+    def get_video_comments(self, video_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Stored comments for a video, newest first"""
+        try:
+            cursor = self._connection().cursor()
+            cursor.execute('''
+                SELECT * FROM comments
+                WHERE video_id = ?
+                ORDER BY published_at DESC
+                LIMIT ?
+            ''', (video_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting comments: {e}")
+            return []
+    
+    def get_comment_watermarks(self, video_ids: List[str]) -> Dict[str, str]:
+        """{video_id: publishedAt of the newest stored comment} for videos that have comments"""
+        watermarks: Dict[str, str] = {}
+        try:
+            cursor = self._connection().cursor()
+            for i in range(0, len(video_ids), 500):
+                chunk = video_ids[i:i+500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT video_id, MAX(published_at) FROM comments
+                    WHERE video_id IN ({placeholders})
+                    GROUP BY video_id
+                ''', chunk)
+                watermarks.update((row[0], row[1]) for row in cursor.fetchall() if row[1])
+            return watermarks
+        except Exception as e:
+            print(f"Error getting comment watermarks: {e}")
+            return {}
+    
+    def get_fresh_influencers(
+        self,
+        channel_ids: List[str],
+        max_age_seconds: float,
+        videos_per_channel: int = 5
+    ) -> Dict[str, Dict[str, Any]]:
+        """Influencers updated within max_age_seconds, keyed by channel ID, with their newest stored videos"""
+        cutoff = (datetime.now() - timedelta(seconds=max_age_seconds)).isoformat()
+        found: Dict[str, Dict[str, Any]] = {}
+        try:
+            cursor = self._connection().cursor()
+            
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(channel_ids), 500):
+                chunk = channel_ids[i:i+500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT * FROM influencers
+                    WHERE channel_id IN ({placeholders}) AND last_updated >= ?
+                ''', (*chunk, cutoff))
+                for row in cursor.fetchall():
+                    data = dict(row)
+                    data['keywords'] = json.loads(data.get('keywords') or '[]')
+                    data['topic_categories'] = json.loads(data.get('topic_categories') or '[]')
+                    data['recent_videos'] = []
+                    found[data['channel_id']] = data
+            
+            fresh_ids = list(found)
+            for i in range(0, len(fresh_ids), 500):
+                chunk = fresh_ids[i:i+500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT * FROM (
+                        SELECT v.*, ROW_NUMBER() OVER (
+                            PARTITION BY channel_id ORDER BY published_at DESC
+                        ) AS position
+                        FROM videos v WHERE channel_id IN ({placeholders})
+                    ) WHERE position <= ?
+                    ORDER BY channel_id, position
+                ''', (*chunk, videos_per_channel))
+                for row in cursor.fetchall():
+                    video = dict(row)
+                    video.pop('position', None)
+                    found[video['channel_id']]['recent_videos'].append(video)
+            
+            return found
+        except Exception as e:
+            print(f"Error getting fresh influencers: {e}")
+            return {}
+    
     def search_influencers(
         self,
         min_subscribers: Optional[int] = None,
@@ -288,9 +621,7 @@ class Database:
     ) -> List[Dict[str, Any]]:
         """Search influencers with filters"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._connection().cursor()
             
             query = 'SELECT * FROM influencers WHERE 1=1'
             params = []
@@ -320,7 +651,6 @@ class Database:
                 data['topic_categories'] = json.loads(data.get('topic_categories', '[]'))
                 influencers.append(data)
             
-            conn.close()
             return influencers
         except Exception as e:
             print(f"Error searching influencers: {e}")
@@ -335,26 +665,19 @@ class Database:
     ):
         """Save network edge"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO network_edges 
-                (source_id, target_id, connection_type, weight, similarity)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (source_id, target_id, connection_type, weight, weight))
-            
-            conn.commit()
-            conn.close()
+            with self._connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO network_edges 
+                    (source_id, target_id, connection_type, weight, similarity)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (source_id, target_id, connection_type, weight, weight))
         except Exception as e:
             print(f"Error saving network edge: {e}")
     
     def get_network_edges(self, channel_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get network edges, optionally filtered by channel"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._connection().cursor()
             
             if channel_id:
                 cursor.execute('''
@@ -365,17 +688,87 @@ class Database:
                 cursor.execute('SELECT * FROM network_edges')
             
             edges = [dict(row) for row in cursor.fetchall()]
-            conn.close()
             return edges
         except Exception as e:
             print(f"Error getting network edges: {e}")
             return []
     
+    def save_campaign_results(self, fingerprint: str, brand_keywords: List[str], ranked: List[Dict[str, Any]], meta: Dict[str, Any]) -> bool:
+        """Cache a ranked campaign result under its fingerprint, replacing any older copy"""
+        rows = [
+            (
+                json.dumps(brand_keywords),
+                entry.get('channel_id', ''),
+                entry.get('match_score', 0.0),
+                json.dumps(entry.get('match_breakdown', {})),
+                fingerprint,
+                rank,
+                json.dumps(entry, default=str),
+                json.dumps(meta, default=str)
+            )
+            for rank, entry in enumerate(ranked)
+        ]
+        try:
+            with self._connection() as conn:
+                conn.execute('DELETE FROM brand_matches WHERE fingerprint = ?', (fingerprint,))
+                conn.executemany('''
+                    INSERT INTO brand_matches (
+                        brand_keywords, channel_id, match_score, match_breakdown,
+                        fingerprint, rank, result, meta
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+            return True
+        except Exception as e:
+            print(f"Error saving campaign results: {e}")
+            return False
+    
+    def get_campaign_results(self, fingerprint: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        """Return {'ranked', 'meta', 'cached_at'} for a fingerprint cached within max_age_seconds"""
+        try:
+            cursor = self._connection().cursor()
+            cursor.execute('''
+                SELECT result, meta, created_at FROM brand_matches
+                WHERE fingerprint = ? AND created_at >= datetime('now', ?)
+                ORDER BY rank
+            ''', (fingerprint, f'-{int(max_age_seconds)} seconds'))
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+            return {
+                'ranked': [json.loads(row[0]) for row in rows],
+                'meta': json.loads(rows[0][1] or '{}'),
+                'cached_at': rows[0][2]
+            }
+        except Exception as e:
+            print(f"Error getting campaign results: {e}")
+            return None
+    
+    def invalidate_campaign_results(self, channel_ids: Optional[List[str]] = None) -> int:
+        """Drop cached campaigns that rank any of channel_ids (all campaigns when None); returns campaigns removed"""
+        try:
+            with self._connection() as conn:
+                if channel_ids is None:
+                    removed = conn.execute(
+                        'SELECT COUNT(DISTINCT fingerprint) FROM brand_matches WHERE fingerprint IS NOT NULL'
+                    ).fetchone()[0]
+                    conn.execute('DELETE FROM brand_matches WHERE fingerprint IS NOT NULL')
+                else:
+                    placeholders = ','.join('?' * len(channel_ids))
+                    fingerprints = [row[0] for row in conn.execute(f'''
+                        SELECT DISTINCT fingerprint FROM brand_matches
+                        WHERE fingerprint IS NOT NULL AND channel_id IN ({placeholders})
+                    ''', list(channel_ids))]
+                    conn.executemany('DELETE FROM brand_matches WHERE fingerprint = ?', [(f,) for f in fingerprints])
+                    removed = len(fingerprints)
+            return removed
+        except Exception as e:
+            print(f"Error invalidating campaign results: {e}")
+            return 0
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._connection().cursor()
             
             stats = {}
             
@@ -396,7 +789,6 @@ class Database:
             avg_subs = cursor.fetchone()[0]
             stats['average_subscribers'] = round(avg_subs, 0) if avg_subs else 0
             
-            conn.close()
             return stats
         except Exception as e:
             print(f"Error getting statistics: {e}")
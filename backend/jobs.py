@@ -0,0 +1,304 @@
+import os
+import json
+import uuid
+import socket
+import sqlite3
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from quota import quota_scope, BACKGROUND
+
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobManager:
+    """Runs long pipelines (e.g. influencer selection) on a bounded pool of background workers,
+    persisting each job's status, progress and result in SQLite so they survive restarts.
+
+    Workers claim jobs from the table itself, so several server processes can share one queue.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        runner: Callable[[Dict[str, Any]], AsyncIterator[Dict[str, Any]]],
+        max_concurrent: int = 2,
+        poll_interval: float = 2.0
+    ):
+        self.db_path = db_path
+        # runner(params) yields pipeline events and ends with {'event': 'final', 'status', 'result'}
+        self.runner = runner
+        # Caps how many jobs spend YouTube quota at once, across all processes sharing db_path
+        self.max_concurrent = max(max_concurrent, 1)
+        # How often idle workers look for jobs submitted through other processes
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._init_db()
+
+    @classmethod
+    def from_env(cls, db_path: str, runner) -> 'JobManager':
+        return cls(
+            db_path,
+            runner,
+            max_concurrent=int(os.getenv('JOBS_MAX_CONCURRENT', '2')),
+            poll_interval=float(os.getenv('JOBS_POLL_SECONDS', '2'))
+        )
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT,
+                status TEXT,
+                params TEXT,
+                progress TEXT,
+                result TEXT,
+                result_status INTEGER,
+                error TEXT,
+                quota_used INTEGER DEFAULT 0,
+                owner TEXT,
+                created_at TEXT,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+        if 'owner' not in {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}:
+            conn.execute('ALTER TABLE jobs ADD COLUMN owner TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)')
+        conn.commit()
+        conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rowcount = conn.execute(sql, params).rowcount
+            conn.commit()
+            return rowcount
+        finally:
+            conn.close()
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    async def start(self):
+        """Start the workers and re-queue jobs left unfinished by a process that has died"""
+        self._wakeup = asyncio.Event()
+        running = await asyncio.to_thread(
+            self._fetch, 'SELECT id, owner FROM jobs WHERE status = ?', (RUNNING,)
+        )
+        for row in running:
+            if not self._owner_alive(row['owner']):
+                # Interrupted mid-flight; run it again from scratch
+                await asyncio.to_thread(
+                    self._execute,
+                    'UPDATE jobs SET status = ?, owner = NULL, started_at = NULL WHERE id = ? AND status = ?',
+                    (QUEUED, row['id'], RUNNING)
+                )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        """Whether the process that claimed a job is still running (jobs on other hosts are left alone)"""
+        host, _, pid = (owner or '').rpartition(':')
+        if not pid.isdigit() or int(pid) == os.getpid():
+            return False
+        if host != socket.gethostname():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs are re-queued on the next start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new job and queue it; returns its status record"""
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(
+            self._execute,
+            'INSERT INTO jobs (id, kind, status, params, progress, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (job_id, kind, QUEUED, json.dumps(params), json.dumps({}), datetime.now().isoformat())
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status and progress of a job, without its result"""
+        rows = await asyncio.to_thread(self._fetch, 'SELECT * FROM jobs WHERE id = ?', (job_id,))
+        if not rows:
+            return None
+        row = dict(rows[0])
+        return {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'progress': json.loads(row['progress'] or '{}'),
+            'error': row['error'],
+            'quota_used': row['quota_used'],
+            'queue_position': await self._queue_position(row) if row['status'] == QUEUED else None,
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    async def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """{'status', 'result_status', 'result'} for a job, or None if it doesn't exist"""
+        rows = await asyncio.to_thread(
+            self._fetch, 'SELECT status, result_status, result FROM jobs WHERE id = ?', (job_id,)
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            'status': row['status'],
+            'result_status': row['result_status'],
+            'result': json.loads(row['result']) if row['result'] else None
+        }
+
+    async def _queue_position(self, row: Dict[str, Any]) -> int:
+        rows = await asyncio.to_thread(
+            self._fetch,
+            'SELECT COUNT(*) AS ahead FROM jobs WHERE status = ? AND created_at < ?',
+            (QUEUED, row['created_at'])
+        )
+        return rows[0]['ahead']
+
+    def _claim_next(self) -> Optional[str]:
+        """Atomically mark the oldest queued job as ours, unless max_concurrent jobs are already running"""
+        rows = self._fetch_write('''
+            UPDATE jobs SET status = ?, owner = ?, started_at = ?
+            WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1)
+              AND status = ?
+              AND (SELECT COUNT(*) FROM jobs WHERE status = ?) < ?
+            RETURNING id
+        ''', (RUNNING, self.owner, datetime.now().isoformat(), QUEUED, QUEUED, RUNNING, self.max_concurrent))
+        return rows[0]['id'] if rows else None
+
+    def _fetch_write(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    async def _worker(self):
+        while True:
+            job_id = None
+            try:
+                job_id = await asyncio.to_thread(self._claim_next)
+                if job_id is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running job {job_id}: {e}")
+            finally:
+                # A finished job frees a slot for workers that found the limit reached
+                if job_id is not None:
+                    self._wakeup.set()
+
+    async def _run(self, job_id: str):
+        rows = await asyncio.to_thread(self._fetch, 'SELECT params FROM jobs WHERE id = ?', (job_id,))
+        params = json.loads(rows[0]['params'])
+
+        progress: Dict[str, Any] = {}
+        final = None
+        with quota_scope(BACKGROUND) as usage:
+            try:
+                async for event in self.runner(params):
+                    if event['event'] == 'final':
+                        final = event
+                        continue
+                    if self._apply_progress(progress, event):
+                        await asyncio.to_thread(
+                            self._execute,
+                            'UPDATE jobs SET progress = ?, quota_used = ? WHERE id = ?',
+                            (json.dumps(progress, default=str), usage['units'], job_id)
+                        )
+            except Exception as e:
+                await self._finish(job_id, FAILED, progress, usage['units'], error=str(e))
+                return
+
+        if final is None:
+            await self._finish(job_id, FAILED, progress, usage['units'], error="Pipeline ended without a result")
+        elif final['status'] != 200:
+            # e.g. the daily quota ran out; the error body is still kept as the result
+            await self._finish(job_id, FAILED, progress, usage['units'], final=final,
+                               error=final['result'].get('message') or final['result'].get('error'))
+        else:
+            await self._finish(job_id, SUCCEEDED, progress, usage['units'], final=final)
+
+    @staticmethod
+    def _apply_progress(progress: Dict[str, Any], event: Dict[str, Any]) -> bool:
+        """Fold a pipeline event into the stored progress; returns whether anything changed"""
+        kind = event.get('event')
+        if kind == 'keywords':
+            progress.update({'stage': 'search', 'completed': 0, 'total': len(event['keywords'])})
+        elif kind == 'keyword':
+            progress.update({'stage': 'search', 'completed': event['completed'], 'total': event['total']})
+            progress['channels_found'] = progress.get('channels_found', 0) + len(event.get('new_channels') or [])
+        elif kind == 'stage':
+            progress.update({'stage': event['stage'], 'channels': event.get('channels')})
+        elif kind == 'provisional':
+            progress['provisional'] = event['ranked']
+        else:
+            return False
+        return True
+
+    async def _finish(
+        self,
+        job_id: str,
+        status: str,
+        progress: Dict[str, Any],
+        quota_used: int,
+        final: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        progress.pop('provisional', None)
+        progress['stage'] = 'done'
+        await asyncio.to_thread(
+            self._execute,
+            '''UPDATE jobs SET status = ?, progress = ?, quota_used = ?, result_status = ?, result = ?,
+               error = ?, finished_at = ? WHERE id = ?''',
+            (
+                status,
+                json.dumps(progress, default=str),
+                quota_used,
+                final['status'] if final else None,
+                json.dumps(final['result'], default=str) if final else None,
+                error,
+                datetime.now().isoformat(),
+                job_id
+            )
+        )
@@ -1,22 +1,14 @@
 import os
+import time
+import importlib.util
 from typing import List
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from metrics import LLM_DURATION
 
+# google-generativeai is imported on first use: it is slow to load and only needed when a key is set
+GENAI_AVAILABLE = importlib.util.find_spec('google') is not None and importlib.util.find_spec('google.generativeai') is not None
 
-class KeywordLLM:
-    def __init__(self, api_key: str | None):
-        self.api_key = api_key
-        self.enabled = bool(api_key and genai)
-        if self.enabled:
-            genai.configure(api_key=api_key)
-            # Use Gemini 2.0 Flash for better performance
-            self.model = genai.GenerativeModel(
-                'gemini-2.0-flash-exp',
-                system_instruction="""You are a professional marketing strategist and influencer marketing expert with 10+ years of experience. 
+SYSTEM_INSTRUCTION = """You are a professional marketing strategist and influencer marketing expert with 10+ years of experience. 
 Your specialty is identifying the perfect keywords and search terms to discover relevant YouTube influencers for brand campaigns.
 
 When given a campaign brief, you analyze:
@@ -33,7 +25,23 @@ Your keywords are:
 - Mix of niche-specific and broader category terms
 - Culturally appropriate and regionally relevant
 - Optimized for YouTube search behavior"""
-            )
+
+
+class KeywordLLM:
+    def __init__(self, api_key: str | None):
+        self.api_key = api_key
+        self.enabled = bool(api_key and GENAI_AVAILABLE)
+        self._model = None
+
+    @property
+    def model(self):
+        """Gemini client, configured on the first keyword request"""
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            # Use Gemini 2.0 Flash for better performance
+            self._model = genai.GenerativeModel('gemini-2.0-flash-exp', system_instruction=SYSTEM_INSTRUCTION)
+        return self._model
 
     def expand_keywords(self, campaign_text: str, seed_keywords: List[str], max_keywords: int = 30, language: str = 'English') -> List[str]:
         """Generate marketing-focused keywords from campaign brief using professional marketer AI"""
@@ -88,7 +96,14 @@ Example format: keyword1, keyword2, keyword3
 Generate the keywords now:"""
 
         try:
-            resp = self.model.generate_content(prompt)
+            model = self.model
+            started = time.perf_counter()
+            try:
+                resp = model.generate_content(prompt)
+            except Exception:
+                LLM_DURATION.observe(time.perf_counter() - started, outcome='error')
+                raise
+            LLM_DURATION.observe(time.perf_counter() - started, outcome='ok')
             text = resp.text or ''
             
             # Parse and clean the keywords
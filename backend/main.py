@@ -1,20 +1,46 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import json
 import os
+import time
 from dotenv import load_dotenv
 
 from youtube_api import YouTubeAPI
-from network_analyzer import NetworkAnalyzer
+from response_cache import ResponseCache
+from quota import quota_scope, current_usage, QuotaExceededError, APIKeyPool, QuotaScheduler
 from matcher import InfluencerMatcher
 from database import Database
 from llm import KeywordLLM
+from comment_harvester import CommentHarvester
+from write_behind import WriteBehindQueue
+from jobs import JobManager, QUEUED, RUNNING
+from shared_state import SharedState
+from channel_resolver import ChannelResolver
+from metrics import REGISTRY, STAGE_DURATION, CACHE_LOOKUPS
 
 load_dotenv()
 
-app = FastAPI(title="GAIM - YouTube Influencer Matching API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared clients on startup and release them on shutdown"""
+    await youtube_api.open()
+    db_writer.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await db_writer.stop()
+    await youtube_api.close()
+    database.close()
+
+
+app = FastAPI(title="GAIM - YouTube Influencer Matching API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,12 +50,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware('http')
+async def track_quota_usage(request, call_next):
+    """Account YouTube quota per HTTP request and report it in a response header"""
+    with quota_scope() as usage:
+        response = await call_next(request)
+    # A streamed body is still running at this point, so the header would undercount;
+    # NDJSON streams report quota_used in their final (or error) event instead
+    if not response.headers.get('content-type', '').startswith('application/x-ndjson'):
+        response.headers['X-YouTube-Quota-Used'] = str(usage['units'])
+    return response
+
+
 # Initialize services
-youtube_api = YouTubeAPI(api_key=os.getenv("YOUTUBE_API_KEY"))
-network_analyzer = NetworkAnalyzer()
+# Set GAIM_SHARED_STATE_PATH when running several worker processes (see DEPLOYMENT.md)
+shared_state = SharedState.from_env()
+key_pool = APIKeyPool.from_env(shared=shared_state)
+youtube_api = YouTubeAPI(
+    api_key=key_pool,
+    cache=ResponseCache.from_env(),
+    quota=QuotaScheduler.from_env(key_count=len(key_pool), shared=shared_state)
+)
 matcher = InfluencerMatcher()
-database = Database()
+database = Database.from_env()
 llm = KeywordLLM(api_key=os.getenv("GEMINI_API_KEY"))
+db_writer = WriteBehindQueue.from_env(database)
+comment_harvester = CommentHarvester.from_env(youtube_api, database, writer=db_writer)
+channel_resolver = ChannelResolver.from_env(youtube_api, database, writer=db_writer)
+job_manager = JobManager.from_env(
+    database.db_path,
+    lambda params: _select_influencers_events(SelectInfluencersRequest(**params))
+)
+
+
+def _is_quota_error(error: BaseException) -> bool:
+    txt = str(error)
+    return isinstance(error, QuotaExceededError) or 'quotaExceeded' in txt or '403' in txt
+
+
+async def _fan_out(
+    items: List[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+    on_result: Optional[Callable[[int, Any], None]] = None
+) -> List[Any]:
+    """Run worker over items with bounded concurrency.
+
+    Results keep the input order; a failed item yields its exception, and items not yet
+    started when a quota error occurs yield None. on_result(index, result) is called as
+    each item finishes, in completion order.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    quota_hit = False
+
+    async def attempt(item):
+        nonlocal quota_hit
+        async with semaphore:
+            if quota_hit:
+                return None
+            try:
+                return await worker(item)
+            except Exception as e:
+                if _is_quota_error(e):
+                    quota_hit = True
+                return e
+
+    async def run(index, item):
+        result = await attempt(item)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    return await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
 
 
 class KeywordExpandRequest(BaseModel):
@@ -56,11 +149,14 @@ class SelectInfluencersRequest(BaseModel):
     top_n: int = 20
     use_network: bool = True
     max_comments_per_video: int = 50
+    # Serve a cached ranking for the same campaign when one is fresh enough
+    use_cache: bool = True
 
 
 @app.post('/api/expand-keywords')
 async def expand_keywords(request: KeywordExpandRequest):
     """Generate keywords using AI or fallback to text analysis"""
+    started = time.perf_counter()
     try:
         all_llm_keywords: List[str] = []
         
@@ -81,13 +177,15 @@ async def expand_keywords(request: KeywordExpandRequest):
         
         # Fallback if AI fails
         if not all_llm_keywords:
-            base_tokens = set()
+            # Seeds first, then brief tokens in reading order, so any per-request search cap keeps the seeds
+            base_tokens = []
             for token in (request.campaign_text or '').lower().split():
                 token = token.strip('.,!?:;"\'()')
                 if len(token) >= 4:
-                    base_tokens.add(token)
-            all_llm_keywords = list(set(request.seed_keywords) | base_tokens)[:30]
+                    base_tokens.append(token)
+            all_llm_keywords = list(dict.fromkeys(list(request.seed_keywords) + base_tokens))[:30]
         
+        STAGE_DURATION.observe(time.perf_counter() - started, stage='keyword_expansion')
         return JSONResponse(content={
             'suggested_keywords': all_llm_keywords,
             'languages': request.languages,
@@ -105,114 +203,302 @@ async def search_top_videos(request: SearchTopVideosRequest):
         # Quota conservation settings
         max_search_calls = int(os.getenv('YT_MAX_SEARCH_CALLS_PER_REQUEST', '25'))
         max_langs = int(os.getenv('YT_MAX_LANGUAGES_PER_KEYWORD', '1'))
+        concurrency = int(os.getenv('YT_SEARCH_CONCURRENCY', '8'))
         
         languages = (request.languages or ['English'])[:max_langs]
-        search_calls = 0
-        limited = False
+        keywords = request.keywords[:20]  # Limit keywords too
         
-        results: Dict[str, List[Dict[str, Any]]] = {}
+        # Plan every keyword x language search up front so the call cap is applied deterministically
+        jobs = [(kw, lang) for kw in keywords for lang in languages]
+        limited = len(jobs) > max_search_calls
+        jobs = jobs[:max_search_calls]
         
-        for kw in request.keywords[:20]:  # Limit keywords too
-            if search_calls >= max_search_calls:
-                limited = True
-                break
-            
-            keyword_videos: List[Dict[str, Any]] = []
-            
-            for lang in languages:
-                if search_calls >= max_search_calls:
-                    limited = True
-                    break
-                
-                try:
-                    vids = await youtube_api.search_videos(
-                        kw,
-                        max_results=request.top_videos_per_keyword,
-                        order=request.order,
-                        region_code='IN',
-                        language=lang,
-                        video_duration=request.video_duration
-                    )
-                    search_calls += 1
-                    keyword_videos.extend(vids)
-                    
-                    # Cache videos
-                    for v in vids:
-                        cid = v.get('channel_id')
-                        if cid:
-                            database.save_videos(cid, [v])
-                
-                except Exception as api_error:
-                    txt = str(api_error)
-                    if 'quotaExceeded' in txt or '403' in txt:
-                        return JSONResponse(status_code=429, content={
-                            'error': 'quota_exceeded',
-                            'message': 'YouTube API quota exceeded. Try after midnight PT or rotate key.',
-                            'partial_results': results,
-                            'search_calls': search_calls
-                        })
-                    raise
+        async def run_search(job):
+            kw, lang = job
+            return await youtube_api.search_videos(
+                kw,
+                max_results=request.top_videos_per_keyword,
+                order=request.order,
+                region_code='IN',
+                language=lang,
+                video_duration=request.video_duration
+            )
+        
+        with STAGE_DURATION.time(stage='video_search'):
+            outcomes = await _fan_out(jobs, run_search, concurrency)
+        
+        # Reassemble in keyword order, regardless of completion order
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        search_calls = 0
+        quota_error = None
+        for (kw, lang), outcome in zip(jobs, outcomes):
+            if outcome is None:
+                continue
+            if isinstance(outcome, Exception):
+                if not _is_quota_error(outcome):
+                    raise outcome
+                quota_error = quota_error or outcome
+                continue
+            search_calls += 1
+            results.setdefault(kw, []).extend(outcome)
             
-            results[kw] = keyword_videos
+            # Cache videos
+            for v in outcome:
+                cid = v.get('channel_id')
+                if cid:
+                    await db_writer.enqueue_videos(cid, [v])
+        
+        if quota_error is not None:
+            return JSONResponse(status_code=429, content={
+                'error': 'quota_exceeded',
+                'message': 'YouTube API quota exceeded on every configured key. Try after midnight PT or add keys to YOUTUBE_API_KEYS.',
+                'partial_results': results,
+                'search_calls': search_calls,
+                'quota_used': current_usage()['units']
+            })
+        
+        # Keywords past the call cap are omitted, matching the sequential behaviour
+        results = {kw: results.get(kw, []) for kw in dict.fromkeys(kw for kw, _ in jobs)}
         
         return JSONResponse(content={
             'results': results,
             'limited': limited,
             'search_calls': search_calls,
-            'languages_used': languages
+            'languages_used': languages,
+            'quota_used': current_usage()['units']
         })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post('/api/select-influencers')
-async def select_influencers(request: SelectInfluencersRequest):
-    """Find and rank influencers based on campaign requirements"""
-    try:
-        # Get keywords if not provided
-        if not request.keywords:
-            expand_resp = await expand_keywords(KeywordExpandRequest(
-                campaign_text=request.campaign_text,
-                seed_keywords=request.seed_keywords
-            ))
-            if hasattr(expand_resp, 'body'):
-                import json
-                request.keywords = json.loads(expand_resp.body.decode('utf-8')).get('suggested_keywords', [])
-        
-        keywords = request.keywords[:40]  # Limit keywords
+def _provisional_ranking(
+    channel_hits: Dict[str, int],
+    video_map: Dict[str, List[Dict[str, Any]]],
+    keyword_count: int,
+    top_n: int
+) -> List[Dict[str, Any]]:
+    """Rank channels by keyword hits alone, while searches are still running"""
+    ranked = []
+    for cid, hits in sorted(channel_hits.items(), key=lambda item: item[1], reverse=True)[:top_n]:
+        videos = video_map.get(cid, [])
+        first = videos[0] if videos else {}
+        hit_score = min(hits / max(keyword_count, 1), 1.0)
+        ranked.append({
+            'channel_id': cid,
+            'title': first.get('channel_title', ''),
+            'thumbnail': first.get('thumbnail', ''),
+            'match_score': 0.0,
+            'hit_score': round(hit_score, 3),
+            'comment_score': 0.0,
+            'network_score': 0.0,
+            'final_score': round(hit_score, 4),
+            'sampled_videos': [v.get('video_id') for v in videos[:3]],
+            'match_breakdown': {},
+            'provisional': True
+        })
+    return ranked
+
+
+def _rank_matches(
+    matches: List[Dict[str, Any]],
+    channel_hits: Dict[str, int],
+    video_map: Dict[str, List[Dict[str, Any]]],
+    keyword_count: int,
+    comment_signals: Dict[str, Dict[str, Any]],
+    top_n: int
+) -> List[Dict[str, Any]]:
+    """Blend match, keyword-hit and comment scores into the final ordering"""
+    enriched = []
+    for m in matches:
+        cid = m.get('channel_id')
+        if not cid:
+            continue
         
-        # Track channel hits and videos
-        channel_hits: Dict[str, int] = {}
-        video_map: Dict[str, List[Dict[str, Any]]] = {}
+        hit_score = min(channel_hits.get(cid, 0) / max(keyword_count, 1), 1.0)
+        base_match = m.get('match_score', 0.0)
+        signals = comment_signals.get(cid, {})
+        comment_score = signals.get('comment_score', 0.0)
         
-        # Search for videos for each keyword
-        for kw in keywords:
-            try:
-                vids = await youtube_api.search_videos(
-                    kw,
-                    max_results=request.top_videos_per_keyword,
-                    order='viewCount',
-                    region_code='IN',
-                    language='English'  # Single language to conserve quota
-                )
-            except Exception:
-                vids = []
-            
-            for v in vids:
-                cid = v.get('channel_id')
-                if not cid:
-                    continue
-                
-                channel_hits[cid] = channel_hits.get(cid, 0) + 1
-                video_map.setdefault(cid, []).append(v)
-                database.save_videos(cid, [v])
+        # Harvest returns an entry for every candidate; only blend comments in where some were sampled
+        if signals.get('videos_sampled'):
+            final_score = base_match * 0.6 + hit_score * 0.25 + comment_score * 0.15
+        else:
+            final_score = base_match * 0.7 + hit_score * 0.3
+        # Bonus for frequent appearances
+        if channel_hits.get(cid, 0) >= 3:
+            final_score = min(final_score * 1.1, 1.0)
         
-        # Get channel details
-        channel_ids = list(channel_hits.keys())
-        channels_data = await youtube_api.get_channels_details(channel_ids) if channel_ids else []
+        enriched.append({
+            **m,
+            'hit_score': round(hit_score, 3),
+            'comment_score': round(comment_score, 4),
+            'comment_signals': signals,
+            'final_score': round(final_score, 4),
+            'sampled_videos': [v.get('video_id') for v in video_map.get(cid, [])[:3]]
+        })
+    
+    # Sort and return top results
+    enriched.sort(key=lambda x: x['final_score'], reverse=True)
+    return enriched[:top_n]
+
+
+def _search_keywords(keywords: List[str]) -> Tuple[List[str], List[str]]:
+    """(searched, dropped): keywords de-duplicated in priority order, one search call each, capped
+    like /api/search-top-videos so the least relevant ones are dropped"""
+    max_search_calls = int(os.getenv('YT_MAX_SEARCH_CALLS_PER_REQUEST', '25'))
+    keywords = list(dict.fromkeys(k for k in keywords[:40] if k.strip()))
+    return keywords[:max_search_calls], keywords[max_search_calls:]
+
+
+def _campaign_fingerprint(request: SelectInfluencersRequest) -> str:
+    """Stable key for a campaign: case, spacing, order and duplicates of keywords don't matter"""
+    def normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+    
+    if request.keywords:
+        # Keyed on what is actually searched: reordering past the call cap searches a different subset
+        searched, _ = _search_keywords(request.keywords)
+        basis = {'keywords': sorted({normalize(k) for k in searched if normalize(k)})}
+    else:
+        # Keywords will be expanded from the brief, so key on the brief itself
+        basis = {
+            'campaign_text': normalize(request.campaign_text),
+            'seed_keywords': sorted({normalize(k) for k in request.seed_keywords if normalize(k)})
+        }
+    basis.update({
+        'top_videos_per_keyword': request.top_videos_per_keyword,
+        'past_videos_to_check': request.past_videos_to_check,
+        'top_n': request.top_n,
+        'use_network': request.use_network,
+        'max_comments_per_video': request.max_comments_per_video
+    })
+    return hashlib.sha256(json.dumps(basis, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+async def _select_influencers_events(request: SelectInfluencersRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Run the selection pipeline, yielding progress events and ending with a 'final' event"""
+    fingerprint = _campaign_fingerprint(request)
+    cache_ttl = float(os.getenv('CAMPAIGN_CACHE_TTL_SECONDS', '21600'))
+    if request.use_cache and cache_ttl > 0:
+        cached = await asyncio.to_thread(database.get_campaign_results, fingerprint, cache_ttl)
+        CACHE_LOOKUPS.inc(cache='campaign', result='hit' if cached else 'miss')
+        if cached:
+            yield {'event': 'final', 'status': 200, 'result': {
+                **cached['meta'],
+                'ranked': cached['ranked'],
+                'cached': True,
+                'cached_at': cached['cached_at'],
+                'quota_used': current_usage()['units']
+            }}
+            return
+    
+    # Get keywords if not provided
+    if not request.keywords:
+        expand_resp = await expand_keywords(KeywordExpandRequest(
+            campaign_text=request.campaign_text,
+            seed_keywords=request.seed_keywords
+        ))
+        if hasattr(expand_resp, 'body'):
+            request.keywords = json.loads(expand_resp.body.decode('utf-8')).get('suggested_keywords', [])
+    
+    # The list is in priority order (caller-supplied, or the expansion's own ranking)
+    keywords, keywords_dropped = _search_keywords(request.keywords)
+    yield {'event': 'keywords', 'keywords': keywords, 'keywords_dropped': keywords_dropped}
+    
+    # Track channel hits and videos
+    channel_hits: Dict[str, int] = {}
+    video_map: Dict[str, List[Dict[str, Any]]] = {}
+    
+    # Search for videos for all keywords concurrently
+    async def run_search(kw):
+        return await youtube_api.search_videos(
+            kw,
+            max_results=request.top_videos_per_keyword,
+            order='viewCount',
+            region_code='IN',
+            language='English'  # Single language to conserve quota
+        )
+    
+    finished: asyncio.Queue = asyncio.Queue()
+    search_started = time.perf_counter()
+    search_task = asyncio.ensure_future(_fan_out(
+        keywords,
+        run_search,
+        int(os.getenv('YT_SEARCH_CONCURRENCY', '8')),
+        on_result=lambda index, outcome: finished.put_nowait((index, outcome))
+    ))
+    try:
+        # Report each keyword as it lands; tallies here are only for provisional rankings
+        seen_hits: Dict[str, int] = {}
+        seen_videos: Dict[str, List[Dict[str, Any]]] = {}
+        for completed in range(1, len(keywords) + 1):
+            index, vids = await finished.get()
+            new_channels = []
+            found = vids is not None and not isinstance(vids, Exception) and len(vids) > 0
+            if found:
+                for v in vids:
+                    cid = v.get('channel_id')
+                    if not cid:
+                        continue
+                    if cid not in seen_hits:
+                        new_channels.append({'channel_id': cid, 'title': v.get('channel_title', '')})
+                    seen_hits[cid] = seen_hits.get(cid, 0) + 1
+                    seen_videos.setdefault(cid, []).append(v)
+            yield {
+                'event': 'keyword',
+                'keyword': keywords[index],
+                'completed': completed,
+                'total': len(keywords),
+                'error': str(vids) if isinstance(vids, Exception) else None,
+                'new_channels': new_channels
+            }
+            if found:
+                yield {
+                    'event': 'provisional',
+                    'stage': 'search',
+                    'ranked': _provisional_ranking(seen_hits, seen_videos, len(keywords), request.top_n)
+                }
+        outcomes = await search_task
+    finally:
+        search_task.cancel()
+    STAGE_DURATION.observe(time.perf_counter() - search_started, stage='video_search')
+    
+    # Budget exhaustion: rank what we already found instead of failing
+    quota_limited = any(o is None or (isinstance(o, Exception) and _is_quota_error(o)) for o in outcomes)
+    
+    # Merge in keyword order so hit counts and sampled videos are deterministic
+    for vids in outcomes:
+        if vids is None or isinstance(vids, Exception):
+            continue
         
-        # Get initial matches
+        for v in vids:
+            cid = v.get('channel_id')
+            if not cid:
+                continue
+            
+            channel_hits[cid] = channel_hits.get(cid, 0) + 1
+            video_map.setdefault(cid, []).append(v)
+            await db_writer.enqueue_videos(cid, [v])
+    
+    # Get channel details
+    channel_ids = list(channel_hits.keys())
+    yield {'event': 'stage', 'stage': 'channels', 'channels': len(channel_ids)}
+    try:
+        # Recently stored channels come from the database; only the rest cost quota
+        with STAGE_DURATION.time(stage='channel_enrichment'):
+            channels_data = await channel_resolver.resolve(channel_ids)
+    except QuotaExceededError as quota_error:
+        yield {'event': 'final', 'status': 429, 'result': {
+            'error': 'quota_exceeded',
+            'message': str(quota_error),
+            'keywords_used': keywords,
+            'quota_used': current_usage()['units']
+        }}
+        return
+    
+    # Get initial matches
+    with STAGE_DURATION.time(stage='matching'):
         matches = matcher.find_matches(
             channels_data=channels_data,
             brand_keywords=keywords,
@@ -220,43 +506,147 @@ async def select_influencers(request: SelectInfluencersRequest):
             min_subscribers=None,
             max_subscribers=None
         )
-        
-        # Simple scoring without heavy comment analysis for quota conservation
-        enriched = []
-        for m in matches:
-            cid = m.get('channel_id')
-            if not cid:
-                continue
-            
-            hit_score = min(channel_hits.get(cid, 0) / max(len(keywords), 1), 1.0)
-            base_match = m.get('match_score', 0.0)
-            
-            # Bonus for frequent appearances
-            final_score = base_match * 0.7 + hit_score * 0.3
-            if channel_hits.get(cid, 0) >= 3:
-                final_score = min(final_score * 1.1, 1.0)
-            
-            enriched.append({
-                **m,
-                'hit_score': round(hit_score, 3),
-                'final_score': round(final_score, 4),
-                'sampled_videos': [v.get('video_id') for v in video_map.get(cid, [])[:3]]
-            })
-        
-        # Sort and return top results
-        enriched.sort(key=lambda x: x['final_score'], reverse=True)
-        top = enriched[:request.top_n]
-        
-        return JSONResponse(content={
-            'ranked': top,
-            'keywords_used': keywords,
-            'channels_considered': len(channels_data)
-        })
+    
+    # Harvest comments only for the strongest candidates to bound quota
+    comment_signals: Dict[str, Dict[str, Any]] = {}
+    if request.max_comments_per_video > 0 and request.past_videos_to_check > 0:
+        yield {
+            'event': 'provisional',
+            'stage': 'match',
+            'ranked': _rank_matches(matches, channel_hits, video_map, len(keywords), {}, request.top_n)
+        }
+        candidate_ids = {m.get('channel_id') for m in matches[:request.top_n * 2]}
+        candidates = [c for c in channels_data if c.get('channel_id') in candidate_ids]
+        yield {'event': 'stage', 'stage': 'comments', 'channels': len(candidates)}
+        try:
+            with STAGE_DURATION.time(stage='comment_harvest'):
+                comment_signals = await comment_harvester.harvest(
+                    candidates,
+                    videos_per_channel=request.past_videos_to_check,
+                    comments_per_video=request.max_comments_per_video,
+                    brand_keywords=keywords
+                )
+        except Exception as e:
+            print(f"Comment harvesting failed: {e}")
+    
+    ranked = _rank_matches(matches, channel_hits, video_map, len(keywords), comment_signals, request.top_n)
+    meta = {
+        'keywords_used': keywords,
+        'keywords_dropped': keywords_dropped,
+        'channels_considered': len(channels_data),
+        'quota_limited': quota_limited
+    }
+    # Partial (quota-limited) rankings are not cached so the next run can complete them
+    if ranked and not quota_limited and cache_ttl > 0:
+        await asyncio.to_thread(database.save_campaign_results, fingerprint, keywords, ranked, meta)
+    
+    yield {'event': 'final', 'status': 200, 'result': {
+        **meta,
+        'ranked': ranked,
+        'cached': False,
+        'quota_used': current_usage()['units']
+    }}
+
+
+@app.post('/api/select-influencers')
+async def select_influencers(request: SelectInfluencersRequest):
+    """Find and rank influencers based on campaign requirements"""
+    try:
+        final = None
+        async for event in _select_influencers_events(request):
+            if event['event'] == 'final':
+                final = event
+        return JSONResponse(status_code=final['status'], content=final['result'])
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post('/api/select-influencers/stream')
+async def select_influencers_stream(request: SelectInfluencersRequest):
+    """Same as /api/select-influencers, streamed as NDJSON progress events"""
+    async def events():
+        try:
+            async for event in _select_influencers_events(request):
+                yield json.dumps(event, default=str) + '\n'
+        except Exception as e:
+            print(f"Error streaming influencer selection: {e}")
+            yield json.dumps({'event': 'error', 'message': str(e), 'quota_used': current_usage()['units']}) + '\n'
+    
+    return StreamingResponse(events(), media_type='application/x-ndjson')
+
+
+@app.post('/api/jobs/select-influencers')
+async def submit_select_influencers_job(request: SelectInfluencersRequest):
+    """Queue /api/select-influencers as a background job; poll /api/jobs/{job_id} for progress"""
+    job = await job_manager.submit('select_influencers', request.model_dump())
+    return JSONResponse(status_code=202, content=job)
+
+
+@app.get('/api/jobs/{job_id}')
+async def get_job(job_id: str):
+    """Status and progress of a background job"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get('/api/jobs/{job_id}/result')
+async def get_job_result(job_id: str):
+    """Result of a finished job (202 while it is still queued or running)"""
+    outcome = await job_manager.result(job_id)
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if outcome['status'] in (QUEUED, RUNNING):
+        return JSONResponse(status_code=202, content=await job_manager.get(job_id))
+    if outcome['result'] is None:
+        job = await job_manager.get(job_id)
+        return JSONResponse(status_code=500, content={'error': 'job_failed', 'message': job['error']})
+    return JSONResponse(status_code=outcome['result_status'], content=outcome['result'])
+
+
+@app.delete('/api/campaign-cache')
+async def invalidate_campaign_cache(channel_ids: Optional[List[str]] = Query(None)):
+    """Drop cached campaign rankings that include any of channel_ids, or all of them"""
+    removed = await asyncio.to_thread(database.invalidate_campaign_results, channel_ids)
+    return {'invalidated': removed}
+
+
+@app.get('/api/quota')
+async def quota_status():
+    """Daily YouTube quota usage for this process"""
+    # Both read the shared ledger in multi-worker mode, so keep them off the event loop
+    return {
+        **await asyncio.to_thread(youtube_api.quota.stats),
+        'keys': await asyncio.to_thread(youtube_api.key_pool.stats)
+    }
+
+
+@app.get('/api/http-pool')
+async def http_pool_stats():
+    """YouTube HTTP connection pool statistics"""
+    return youtube_api.pool_stats()
+
+
+@app.get('/api/channel-resolver')
+async def channel_resolver_stats():
+    """How many channels were served from the database versus fetched from YouTube"""
+    return channel_resolver.stats()
+
+
+@app.get('/api/db-writer')
+async def db_writer_stats():
+    """Write-behind queue statistics"""
+    return db_writer.stats()
+
+
+@app.get('/metrics')
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4')
+
+
 @app.get('/api/health')
 async def health():
     """Health check endpoint"""
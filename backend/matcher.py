@@ -1,7 +1,4 @@
 from typing import List, Dict, Any, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 from collections import Counter
 import math
 from datetime import datetime, timedelta
@@ -11,13 +8,21 @@ class InfluencerMatcher:
     """AI-based influencer matching using content analysis and ML"""
     
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2),  # Unigrams and bigrams
-            min_df=1,
-            max_df=0.95
-        )
+        # scikit-learn takes over a second to import, so the vectorizer is built on first use
+        self._vectorizer = None
+    
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(
+                max_features=1000,
+                stop_words='english',
+                ngram_range=(1, 2),  # Unigrams and bigrams
+                min_df=1,
+                max_df=0.95
+            )
+        return self._vectorizer
     
     def find_matches(
         self,
@@ -161,6 +166,7 @@ class InfluencerMatcher:
             tfidf_matrix = self.vectorizer.fit_transform(texts)
             
             # Calculate cosine similarity
+            from sklearn.metrics.pairwise import cosine_similarity
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
             
             return float(similarity)
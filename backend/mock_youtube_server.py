@@ -0,0 +1,65 @@
+"""Local stand-in for the YouTube Data API that serves recorded responses.
+
+Record a session first, then point the backend at this server:
+
+    YT_RECORD_DIR=recordings python main.py                     # capture real traffic
+    python mock_youtube_server.py recordings --port 8090 --latency-ms 80 --error-rate 0.02
+    YT_BASE_URL=http://127.0.0.1:8090/youtube/v3 python main.py  # replay it
+
+Alternatively set YT_REPLAY_DIR=recordings to replay in-process without any server.
+"""
+import argparse
+import random
+
+from aiohttp import web
+
+from recording import RecordingStore, ReplayTransport
+
+
+def create_app(transport: ReplayTransport, quota_error_rate: float = 0.0) -> web.Application:
+    """Build the aiohttp app serving /youtube/v3/{endpoint}"""
+
+    async def handle(request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        params = {k: v for k, v in request.query.items() if k != 'key'}
+
+        if quota_error_rate and random.random() < quota_error_rate:
+            return web.json_response({
+                'error': {'code': 403, 'errors': [{'reason': 'quotaExceeded'}]}
+            }, status=403)
+
+        status, body, etag = await transport.respond(endpoint, params)
+        headers = {'ETag': etag} if etag else None
+        if isinstance(body, (dict, list)):
+            return web.json_response(body, status=status, headers=headers)
+        return web.Response(text=str(body), status=status, headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/youtube/v3/{endpoint}', handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded YouTube API responses for offline benchmarking")
+    parser.add_argument('recordings', help="Directory written by YT_RECORD_DIR")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Fixed delay added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Extra random delay, uniform in [0, jitter]")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--quota-error-rate', type=float, default=0.0, help="Share of requests answered with 403 quotaExceeded")
+    args = parser.parse_args()
+
+    transport = ReplayTransport(
+        RecordingStore(args.recordings),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status
+    )
+    web.run_app(create_app(transport, args.quota_error_rate), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
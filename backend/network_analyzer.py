@@ -1,4 +1,3 @@
-import networkx as nx
 from typing import List, Dict, Any, Optional
 import json
 from collections import Counter
@@ -9,7 +8,19 @@ class NetworkAnalyzer:
     """Builds and analyzes network graphs from influencer data"""
     
     def __init__(self):
-        self.graph = nx.Graph()
+        # networkx is imported on first use; it is slow to load and most workers never build a graph
+        self._graph = None
+    
+    @property
+    def graph(self):
+        if self._graph is None:
+            import networkx as nx
+            self._graph = nx.Graph()
+        return self._graph
+    
+    @graph.setter
+    def graph(self, value):
+        self._graph = value
     
     def build_network(self, channels_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -20,6 +31,8 @@ class NetworkAnalyzer:
         - Geographic proximity
         - Video collaborations (if detectable)
         """
+        import networkx as nx
+        
         # Create a new graph
         G = nx.Graph()
         
@@ -152,8 +165,9 @@ class NetworkAnalyzer:
         # Return weighted average
         return sum(similarity_scores) if similarity_scores else 0.0
     
-    def _calculate_network_metrics(self, G: nx.Graph) -> Dict[str, Any]:
+    def _calculate_network_metrics(self, G: 'nx.Graph') -> Dict[str, Any]:
         """Calculate network analysis metrics"""
+        import networkx as nx
         if G.number_of_nodes() == 0:
             return {}
         
@@ -200,7 +214,7 @@ class NetworkAnalyzer:
         
         return metrics
     
-    def _graph_to_dict(self, G: nx.Graph) -> Dict[str, Any]:
+    def _graph_to_dict(self, G: 'nx.Graph') -> Dict[str, Any]:
         """Convert NetworkX graph to dictionary for JSON serialization"""
         nodes = []
         edges = []
@@ -226,6 +240,7 @@ class NetworkAnalyzer:
     
     def export_to_gexf(self, filepath: str) -> bool:
         """Export graph to GEXF format for Gephi"""
+        import networkx as nx
         try:
             nx.write_gexf(self.graph, filepath)
             return True
@@ -235,6 +250,7 @@ class NetworkAnalyzer:
     
     def export_to_graphml(self, filepath: str) -> bool:
         """Export graph to GraphML format (also Gephi-compatible)"""
+        import networkx as nx
         try:
             nx.write_graphml(self.graph, filepath)
             return True
@@ -244,6 +260,7 @@ class NetworkAnalyzer:
     
     def get_network_statistics(self) -> Dict[str, Any]:
         """Get comprehensive network statistics"""
+        import networkx as nx
         if self.graph.number_of_nodes() == 0:
             return {}
         
@@ -0,0 +1,402 @@
+import os
+import time
+import hashlib
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from zoneinfo import ZoneInfo
+
+from metrics import YOUTUBE_QUOTA_UNITS
+
+
+# YouTube Data API v3 unit cost per call
+ENDPOINT_COSTS = {
+    'search': 100,
+    'channels': 1,
+    'videos': 1,
+    'playlistItems': 1,
+    'commentThreads': 1,
+}
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# The daily quota resets at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# Per-request accounting, shared with any tasks spawned inside a quota_scope
+_request_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar('yt_request_usage', default=None)
+_request_priority: ContextVar[str] = ContextVar('yt_request_priority', default=INTERACTIVE)
+# Set inside a coalesced upstream call, which several scopes may be waiting on
+_shared_call: ContextVar[Optional['SharedCall']] = ContextVar('yt_shared_call', default=None)
+
+
+class QuotaExceededError(Exception):
+    """Raised when a call would exceed the daily YouTube quota budget"""
+
+
+@contextmanager
+def quota_scope(priority: str = INTERACTIVE):
+    """Track the quota consumed by everything awaited inside the block.
+
+    Yields a dict {'units': int, 'calls': {endpoint: count}} that is updated in place.
+    """
+    usage: Dict[str, Any] = {'units': 0, 'calls': {}}
+    usage_token = _request_usage.set(usage)
+    priority_token = _request_priority.set(priority)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(usage_token)
+        _request_priority.reset(priority_token)
+
+
+def current_usage() -> Dict[str, Any]:
+    """Quota consumed so far by the enclosing quota_scope (zeros outside a scope)"""
+    usage = _request_usage.get()
+    if usage is None:
+        return {'units': 0, 'calls': {}}
+    return usage
+
+
+def _apply_usage(usage: Optional[Dict[str, Any]], units: int, calls: Dict[str, int], sign: int = 1):
+    if usage is None:
+        return
+    usage['units'] = max(usage['units'] + sign * units, 0)
+    for endpoint, count in calls.items():
+        usage['calls'][endpoint] = max(usage['calls'].get(endpoint, 0) + sign * count, 0)
+
+
+class SharedCall:
+    """Quota context for one upstream call that several callers await (single-flight).
+
+    The call runs at the highest priority among its callers, and its units are charged to one
+    caller's quota_scope: the first interactive one to join, otherwise the caller that started it.
+    """
+
+    def __init__(self):
+        self.priority = BACKGROUND
+        self.usage: Dict[str, Any] = {'units': 0, 'calls': {}}
+        self._owner: Optional[Dict[str, Any]] = None
+        self._owner_priority: Optional[str] = None
+
+    def join(self):
+        """Register the current task's quota_scope as a caller of this call"""
+        priority = _current_priority()
+        if priority == INTERACTIVE:
+            self.priority = INTERACTIVE
+        if self._owner_priority is None or (priority == INTERACTIVE and self._owner_priority != INTERACTIVE):
+            # Move anything already charged over to the new owner
+            _apply_usage(self._owner, self.usage['units'], self.usage['calls'], -1)
+            self._owner = _current_usage_dict()
+            self._owner_priority = priority
+            _apply_usage(self._owner, self.usage['units'], self.usage['calls'])
+
+    def charge(self, endpoint: str, units: int, sign: int = 1):
+        _apply_usage(self.usage, units, {endpoint: 1}, sign)
+        _apply_usage(self._owner, units, {endpoint: 1}, sign)
+
+    async def run(self, awaitable):
+        """Await the upstream call with this object as its quota context (call from inside its task)"""
+        _shared_call.set(self)
+        return await awaitable
+
+
+def _current_priority() -> str:
+    call = _shared_call.get()
+    return call.priority if call is not None else _request_priority.get()
+
+
+def _current_usage_dict() -> Optional[Dict[str, Any]]:
+    call = _shared_call.get()
+    return call.usage if call is not None else _request_usage.get()
+
+
+def _charge(endpoint: str, units: int, sign: int = 1):
+    call = _shared_call.get()
+    if call is not None:
+        call.charge(endpoint, units, sign)
+    else:
+        _apply_usage(_request_usage.get(), units, {endpoint: 1}, sign)
+
+
+def pacific_day() -> str:
+    """Current quota day (Pacific time) as YYYY-MM-DD"""
+    return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+class QuotaScheduler:
+    """Central gate for YouTube calls: per-endpoint unit costs, a daily budget and a token-bucket rate limit"""
+
+    def __init__(
+        self,
+        daily_budget: int = 10000,
+        requests_per_second: float = 10.0,
+        burst: int = 20,
+        interactive_reserve: float = 0.2,
+        shared=None
+    ):
+        self.daily_budget = daily_budget
+        self.rate = requests_per_second
+        self.burst = burst
+        # Share of the daily budget that background work may not touch
+        self.interactive_reserve = interactive_reserve
+        # Optional SharedState: the daily budget is then tracked across all worker processes
+        self.shared = shared
+
+        self._day = pacific_day()
+        self._used = 0
+        self._used_by_endpoint: Dict[str, int] = {}
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._interactive_waiting = 0
+
+    @classmethod
+    def from_env(cls, key_count: int = 1, shared=None) -> 'QuotaScheduler':
+        # YT_DAILY_QUOTA is per API key; the pool's total budget scales with the number of keys
+        return cls(
+            daily_budget=int(os.getenv('YT_DAILY_QUOTA', '10000')) * max(key_count, 1),
+            requests_per_second=float(os.getenv('YT_REQUESTS_PER_SECOND', '10')),
+            burst=int(os.getenv('YT_REQUEST_BURST', '20')),
+            interactive_reserve=float(os.getenv('YT_QUOTA_INTERACTIVE_RESERVE', '0.2')),
+            shared=shared
+        )
+
+    @staticmethod
+    def cost_of(endpoint: str) -> int:
+        return ENDPOINT_COSTS.get(endpoint, 1)
+
+    def _roll_day(self) -> bool:
+        """Reset the counters when the Pacific day changes; True when it did"""
+        today = pacific_day()
+        if today == self._day:
+            return False
+        self._day = today
+        self._used = 0
+        self._used_by_endpoint = {}
+        return True
+
+    def _purge_old_days(self):
+        """Drop earlier days from the shared ledger (blocking)"""
+        if self.shared is not None:
+            self.shared.purge_before(self._day)
+
+    def _total_used(self) -> int:
+        if self.shared is not None:
+            return self.shared.usage(self._day, 'total').get('total', 0)
+        return self._used
+
+    def _limit_for(self, priority: str) -> int:
+        if priority == BACKGROUND:
+            return int(self.daily_budget * (1 - self.interactive_reserve))
+        return self.daily_budget
+
+    async def acquire(self, endpoint: str) -> int:
+        """Reserve quota for one call and wait for a rate-limit token; returns the units charged"""
+        if self._roll_day():
+            await asyncio.to_thread(self._purge_old_days)
+        priority = _current_priority()
+        cost = self.cost_of(endpoint)
+
+        # Reserve before waiting so concurrent callers cannot overshoot the budget
+        if self.shared is not None:
+            reserved = await asyncio.to_thread(
+                self.shared.reserve, self._day, 'total', cost, self._limit_for(priority), [f'endpoint:{endpoint}']
+            )
+        else:
+            reserved = self._used + cost <= self._limit_for(priority)
+            if reserved:
+                self._used += cost
+                self._used_by_endpoint[endpoint] = self._used_by_endpoint.get(endpoint, 0) + cost
+
+        if not reserved:
+            used = await asyncio.to_thread(self._total_used) if self.shared is not None else self._used
+            raise QuotaExceededError(
+                f"quotaExceeded: daily YouTube budget exhausted "
+                f"({used}/{self.daily_budget} units used, {endpoint} costs {cost})"
+            )
+
+        YOUTUBE_QUOTA_UNITS.inc(cost, endpoint=endpoint)
+        await self._take_token()
+
+        _charge(endpoint, cost)
+        return cost
+
+    async def refund(self, endpoint: str):
+        """Return the units acquire() charged for a call that never reached YouTube"""
+        cost = self.cost_of(endpoint)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.release, self._day, 'total', cost, [f'endpoint:{endpoint}'])
+        else:
+            self._used = max(self._used - cost, 0)
+            self._used_by_endpoint[endpoint] = max(self._used_by_endpoint.get(endpoint, 0) - cost, 0)
+        # YOUTUBE_QUOTA_UNITS is a monotonic counter and keeps the charge
+        _charge(endpoint, cost, -1)
+
+    async def _take_token(self):
+        """Token bucket; background callers yield while interactive callers are waiting"""
+        counted = False
+        try:
+            while True:
+                # Re-read each pass: a shared call is promoted when an interactive caller joins it
+                interactive = _current_priority() == INTERACTIVE
+                if interactive and not counted:
+                    self._interactive_waiting += 1
+                    counted = True
+
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1 and (interactive or self._interactive_waiting == 0):
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep(max((1 - self._tokens) / self.rate, 0.01))
+        finally:
+            if counted:
+                self._interactive_waiting -= 1
+
+    async def mark_exhausted(self):
+        """YouTube reported quotaExceeded: treat the rest of the day as spent"""
+        if self._roll_day():
+            await asyncio.to_thread(self._purge_old_days)
+        self._used = max(self._used, self.daily_budget)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.raise_to, self._day, 'total', self.daily_budget)
+
+    def stats(self) -> Dict[str, Any]:
+        """Today's usage (blocking in shared mode; call through asyncio.to_thread)"""
+        if self._roll_day():
+            self._purge_old_days()
+        used = self._total_used()
+        if self.shared is not None:
+            by_endpoint = {
+                scope.split(':', 1)[1]: units
+                for scope, units in self.shared.usage(self._day, 'endpoint:').items()
+            }
+        else:
+            by_endpoint = dict(self._used_by_endpoint)
+        return {
+            'day': self._day,
+            'daily_budget': self.daily_budget,
+            'used': used,
+            'remaining': max(self.daily_budget - used, 0),
+            'used_by_endpoint': by_endpoint,
+            'shared': self.shared is not None,
+        }
+
+
+class APIKeyPool:
+    """Pool of YouTube API keys with per-key daily usage and failover on quotaExceeded"""
+
+    def __init__(self, keys: List[str], per_key_budget: int = 10000, shared=None):
+        # Drop blanks and duplicates while keeping the configured order
+        self.keys = list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+        self.per_key_budget = per_key_budget
+        # Optional SharedState so every worker process sees the same per-key usage
+        self.shared = shared
+        self._day = pacific_day()
+        self._used: Dict[str, int] = {k: 0 for k in self.keys}
+        self._exhausted: set = set()
+
+    @classmethod
+    def from_env(cls, shared=None) -> 'APIKeyPool':
+        """Keys from YOUTUBE_API_KEYS (comma separated), falling back to YOUTUBE_API_KEY"""
+        keys = os.getenv('YOUTUBE_API_KEYS', '').split(',')
+        keys.append(os.getenv('YOUTUBE_API_KEY', ''))
+        return cls(keys, per_key_budget=int(os.getenv('YT_DAILY_QUOTA', '10000')), shared=shared)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _roll_day(self):
+        today = pacific_day()
+        if today != self._day:
+            self._day = today
+            self._used = {k: 0 for k in self.keys}
+            self._exhausted = set()
+
+    @staticmethod
+    def _scope(key: str) -> str:
+        # Keys are stored hashed so the shared ledger never holds credentials
+        return f"key:{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+    def _sync_shared(self):
+        """Refresh per-key usage and exhaustion from the shared ledger (blocking; run off the event loop)"""
+        if self.shared is None:
+            return
+        usage = self.shared.usage(self._day, 'key:')
+        exhausted = self.shared.usage(self._day, 'exhausted:')
+        self._used = {k: usage.get(self._scope(k), 0) for k in self.keys}
+        self._exhausted = {k for k in self.keys if f"exhausted:{self._scope(k)}" in exhausted}
+
+    async def available(self) -> List[str]:
+        self._roll_day()
+        if self.shared is not None:
+            await asyncio.to_thread(self._sync_shared)
+        return [k for k in self.keys if k not in self._exhausted]
+
+    async def choose(self, cost: int) -> str:
+        """Pick the least-used key that can still afford the call, spreading load across the pool"""
+        self._roll_day()
+        if self.shared is not None:
+            # Other workers' exhaustion markers are checked in the same ledger transaction as the reservation
+            scopes = {self._scope(k): k for k in self.keys if k not in self._exhausted}
+            chosen = None
+            if scopes:
+                chosen = await asyncio.to_thread(
+                    self.shared.reserve_least_used, self._day, list(scopes), cost, self.per_key_budget, 'exhausted:'
+                )
+            if chosen is None:
+                raise QuotaExceededError("quotaExceeded: every YouTube API key in the pool is exhausted")
+            return scopes[chosen]
+
+        candidates = [k for k in self.keys if k not in self._exhausted and self._used[k] + cost <= self.per_key_budget]
+        if not candidates:
+            raise QuotaExceededError("quotaExceeded: every YouTube API key in the pool is exhausted")
+        key = min(candidates, key=lambda k: self._used[k])
+        self._used[key] += cost
+        return key
+
+    async def charge(self, key: str, cost: int) -> bool:
+        """Reserve cost on a specific key (e.g. a hedged duplicate of a call already sent with it);
+        False when the key cannot afford it"""
+        self._roll_day()
+        if key in self._exhausted:
+            return False
+        if self.shared is not None:
+            return await asyncio.to_thread(self.shared.reserve, self._day, self._scope(key), cost, self.per_key_budget)
+        if key not in self._used or self._used[key] + cost > self.per_key_budget:
+            return False
+        self._used[key] += cost
+        return True
+
+    async def mark_exhausted(self, key: str):
+        """YouTube rejected this key for the rest of the Pacific day"""
+        self._roll_day()
+        self._exhausted.add(key)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.raise_to, self._day, f"exhausted:{self._scope(key)}", 1)
+
+    async def refund(self, key: str, cost: int):
+        """Return units choose() reserved on key for a call that was never sent"""
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.release, self._day, self._scope(key), cost)
+        elif key in self._used:
+            self._used[key] = max(self._used[key] - cost, 0)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key usage (blocking in shared mode; call through asyncio.to_thread)"""
+        self._roll_day()
+        self._sync_shared()
+        return [
+            {
+                'key': f"...{k[-4:]}",
+                'used': self._used[k],
+                'exhausted': k in self._exhausted
+            }
+            for k in self.keys
+        ]
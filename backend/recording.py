@@ -0,0 +1,96 @@
+import os
+import json
+import random
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+
+from response_cache import ResponseCache
+
+
+# Endpoints whose responses are captured in record mode
+RECORDED_ENDPOINTS = {'search', 'channels', 'playlistItems', 'videos', 'commentThreads'}
+
+
+class RecordingStore:
+    """On-disk store of YouTube responses, one JSON file per endpoint + normalized params"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, endpoint: str, params: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, endpoint, f"{ResponseCache.make_key(endpoint, params)}.json")
+
+    def save(self, endpoint: str, params: Dict[str, Any], status: int, body: Any):
+        """Write one response; the API key is never stored"""
+        if endpoint not in RECORDED_ENDPOINTS:
+            return
+        path = self.path_for(endpoint, params)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'endpoint': endpoint,
+                    'params': {k: v for k, v in params.items() if k != 'key'},
+                    'status': status,
+                    'body': body
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error recording {endpoint} response: {e}")
+
+    def load(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        path = self.path_for(endpoint, params)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+class ReplayTransport:
+    """Serves recorded responses in place of the network, with latency and error injection"""
+
+    def __init__(
+        self,
+        store: RecordingStore,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503
+    ):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_env(cls) -> Optional['ReplayTransport']:
+        directory = os.getenv('YT_REPLAY_DIR')
+        if not directory:
+            return None
+        return cls(
+            RecordingStore(directory),
+            latency_ms=float(os.getenv('YT_REPLAY_LATENCY_MS', '0')),
+            jitter_ms=float(os.getenv('YT_REPLAY_JITTER_MS', '0')),
+            error_rate=float(os.getenv('YT_REPLAY_ERROR_RATE', '0')),
+            error_status=int(os.getenv('YT_REPLAY_ERROR_STATUS', '503'))
+        )
+
+    async def respond(self, endpoint: str, params: Dict[str, Any]) -> Tuple[int, Any, Optional[str]]:
+        """Return (status, body, etag) like YouTubeAPI._send"""
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if self.error_rate and random.random() < self.error_rate:
+            return self.error_status, f"Injected error for {endpoint}", None
+
+        recording = self.store.load(endpoint, params)
+        if recording is None:
+            return 404, f"No recording for {endpoint} {json.dumps(params, sort_keys=True, default=str)}", None
+
+        body = recording['body']
+        if recording.get('status', 200) != 200:
+            return recording['status'], body, None
+        return 200, body, body.get('etag') if isinstance(body, dict) else None
@@ -0,0 +1,109 @@
+import os
+import time
+import random
+from collections import deque
+from typing import Dict, Optional
+
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are being short-circuited"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> 'RetryPolicy':
+        return cls(
+            max_attempts=int(os.getenv('YT_MAX_ATTEMPTS', '3')),
+            base_delay=float(os.getenv('YT_RETRY_BASE_DELAY', '0.5')),
+            max_delay=float(os.getenv('YT_RETRY_MAX_DELAY', '8'))
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @classmethod
+    def from_env(cls) -> 'CircuitBreaker':
+        return cls(
+            failure_threshold=int(os.getenv('YT_BREAKER_THRESHOLD', '5')),
+            reset_timeout=float(os.getenv('YT_BREAKER_RESET_SECONDS', '30'))
+        )
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def check(self):
+        """Raise CircuitOpenError if calls are being short-circuited, without claiming the half-open probe"""
+        state = self.state
+        if state == 'open' or (state == 'half_open' and self._probe_in_flight):
+            raise CircuitOpenError("YouTube API circuit breaker is open; upstream is failing")
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go through"""
+        state = self.state
+        if state == 'open' or (state == 'half_open' and self._probe_in_flight):
+            raise CircuitOpenError("YouTube API circuit breaker is open; upstream is failing")
+        if state == 'half_open':
+            self._probe_in_flight = True
+
+    def release_probe(self):
+        """A half-open probe ended without a verdict (e.g. it was cancelled)"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._probe_in_flight or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latency samples, used to pick the hedging delay"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, endpoint: str, seconds: float):
+        self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, endpoint: str, pct: float = 0.95) -> Optional[float]:
+        """Latency percentile in seconds, or None until enough samples exist"""
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
@@ -0,0 +1,213 @@
+import sqlite3
+import json
+import time
+import hashlib
+import asyncio
+import threading
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+# Default freshness window per YouTube endpoint, in seconds
+DEFAULT_TTLS = {
+    'search': 6 * 3600,
+    'channels': 24 * 3600,
+    'videos': 6 * 3600,
+    'playlistItems': 6 * 3600,
+    'commentThreads': 12 * 3600,
+}
+
+
+class ResponseCache:
+    """SQLite-backed cache for YouTube API responses with per-endpoint TTLs and ETag revalidation.
+
+    Recently used entries are also kept in memory, so hot lookups never touch the disk; SQLite
+    work runs on worker threads over persistent per-thread connections.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "yt_response_cache.db",
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 3600,
+        max_stale: int = 7 * 24 * 3600,
+        memory_entries: int = 1000,
+        purge_every: int = 1000
+    ):
+        self.db_path = db_path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        # Expired entries are kept this long so they can still be revalidated by ETag
+        self.max_stale = max_stale
+        # In-memory LRU front layer: cache_key -> (parsed body, etag, fetched_at); 0 disables it
+        self.memory_entries = memory_entries
+        self._memory: 'OrderedDict[str, Tuple[Any, Optional[str], float]]' = OrderedDict()
+        self._local = threading.local()
+        # Expired rows are only overwritten, never removed, so purge them every purge_every writes (0 never)
+        self.purge_every = purge_every
+        self._writes_since_purge = 0
+        self.init_cache()
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseCache']:
+        """Build a cache from YT_CACHE_PATH / YT_CACHE_TTLS, or None when caching is disabled"""
+        db_path = os.getenv('YT_CACHE_PATH')
+        if not db_path:
+            return None
+
+        # Format: "search=21600,channels=86400"
+        ttls: Dict[str, int] = {}
+        for pair in os.getenv('YT_CACHE_TTLS', '').split(','):
+            endpoint, _, seconds = pair.partition('=')
+            if endpoint.strip() and seconds.strip().isdigit():
+                ttls[endpoint.strip()] = int(seconds)
+        return cls(
+            db_path=db_path,
+            ttls=ttls,
+            memory_entries=int(os.getenv('YT_CACHE_MEMORY_ENTRIES', '1000')),
+            purge_every=int(os.getenv('YT_CACHE_PURGE_EVERY', '1000'))
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def init_cache(self):
+        """Create the cache table"""
+        conn = self._connection()
+        # WAL so several worker processes can share one cache file
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                body TEXT,
+                etag TEXT,
+                fetched_at REAL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_age ON responses(endpoint, fetched_at)')
+        conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Build a cache key from the endpoint and normalized params (the API key is excluded)"""
+        normalized = sorted(
+            (str(k), str(v)) for k, v in params.items() if k != 'key' and v is not None
+        )
+        raw = json.dumps([endpoint, normalized], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _remember(self, cache_key: str, body: Any, etag: Optional[str], fetched_at: float):
+        if self.memory_entries <= 0:
+            return
+        self._memory[cache_key] = (body, etag, fetched_at)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _entry(self, endpoint: str, body: Any, etag: Optional[str], fetched_at: float) -> Optional[Dict[str, Any]]:
+        age = time.time() - fetched_at
+        if age > self.ttl_for(endpoint) + self.max_stale:
+            return None
+        return {'body': body, 'etag': etag, 'fresh': age <= self.ttl_for(endpoint)}
+
+    async def get(self, cache_key: str, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Return {'body', 'etag', 'fresh'} for a cached response, or None"""
+        remembered = self._memory.get(cache_key)
+        if remembered is not None:
+            self._memory.move_to_end(cache_key)
+            entry = self._entry(endpoint, *remembered)
+            if entry and entry['fresh']:
+                return entry
+        # Stale or unknown here; another worker may have refreshed it on disk
+        row = await asyncio.to_thread(self._read, cache_key)
+        if not row:
+            return self._entry(endpoint, *remembered) if remembered is not None else None
+
+        body, etag, fetched_at = row
+        if remembered is not None and remembered[2] >= fetched_at:
+            return self._entry(endpoint, *remembered)
+        body = json.loads(body)
+        self._remember(cache_key, body, etag, fetched_at)
+        return self._entry(endpoint, body, etag, fetched_at)
+
+    async def set(self, cache_key: str, endpoint: str, body: Dict[str, Any], etag: Optional[str] = None):
+        """Store a response"""
+        fetched_at = time.time()
+        self._remember(cache_key, body, etag, fetched_at)
+        await asyncio.to_thread(self._write, cache_key, endpoint, json.dumps(body), etag, fetched_at)
+        self._writes_since_purge += 1
+        if self.purge_every and self._writes_since_purge >= self.purge_every:
+            self._writes_since_purge = 0
+            await asyncio.to_thread(self.purge_expired)
+
+    async def touch(self, cache_key: str):
+        """Mark a revalidated (304 Not Modified) entry as fresh again"""
+        fetched_at = time.time()
+        remembered = self._memory.get(cache_key)
+        if remembered is not None:
+            self._remember(cache_key, remembered[0], remembered[1], fetched_at)
+        await asyncio.to_thread(self._touch, cache_key, fetched_at)
+
+    def _read(self, cache_key: str) -> Optional[tuple]:
+        try:
+            return self._connection().execute(
+                'SELECT body, etag, fetched_at FROM responses WHERE cache_key = ?',
+                (cache_key,)
+            ).fetchone()
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            return None
+
+    def _write(self, cache_key: str, endpoint: str, body: str, etag: Optional[str], fetched_at: float):
+        try:
+            with self._connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO responses (cache_key, endpoint, body, etag, fetched_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (cache_key, endpoint, body, etag, fetched_at))
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+
+    def _touch(self, cache_key: str, fetched_at: float):
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    'UPDATE responses SET fetched_at = ? WHERE cache_key = ?',
+                    (fetched_at, cache_key)
+                )
+        except Exception as e:
+            print(f"Error updating response cache: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete entries too old to be revalidated; returns rows removed (blocking)"""
+        removed = 0
+        try:
+            with self._connection() as conn:
+                now = time.time()
+                for endpoint, ttl in self.ttls.items():
+                    cursor = conn.execute(
+                        'DELETE FROM responses WHERE endpoint = ? AND fetched_at < ?',
+                        (endpoint, now - ttl - self.max_stale)
+                    )
+                    removed += cursor.rowcount
+                placeholders = ','.join('?' * len(self.ttls))
+                cursor = conn.execute(
+                    f'DELETE FROM responses WHERE endpoint NOT IN ({placeholders}) AND fetched_at < ?',
+                    (*self.ttls.keys(), now - self.default_ttl - self.max_stale)
+                )
+                removed += cursor.rowcount
+        except Exception as e:
+            print(f"Error purging response cache: {e}")
+            return 0
+        return removed
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+
+class SharedState:
+    """Cross-process state in a WAL-mode SQLite file: daily quota counters.
+
+    Every uvicorn/gunicorn worker on the host points at the same file (GAIM_SHARED_STATE_PATH),
+    so quota reservations are checked against the pool-wide total instead of per process.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = 10.0):
+        self.db_path = db_path
+        # Seconds a writer waits for another process's transaction before failing
+        self.busy_timeout = busy_timeout
+        self.init_state()
+
+    @classmethod
+    def from_env(cls) -> Optional['SharedState']:
+        """Shared mode is enabled by GAIM_SHARED_STATE_PATH; None keeps state per process"""
+        db_path = os.getenv('GAIM_SHARED_STATE_PATH')
+        if not db_path:
+            return None
+        return cls(db_path, busy_timeout=float(os.getenv('GAIM_SHARED_STATE_TIMEOUT', '10')))
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_state(self):
+        conn = self._connect()
+        # WAL lets readers in other workers proceed while one worker is writing
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS quota_ledger (
+                day TEXT,
+                scope TEXT,
+                units INTEGER,
+                PRIMARY KEY (day, scope)
+            )
+        ''')
+        conn.close()
+
+    # Quota ledger
+
+    def reserve(self, day: str, scope: str, units: int, limit: int, also: Optional[List[str]] = None) -> bool:
+        """Atomically add units to scope unless that would pass limit; scopes in `also` are
+        charged alongside (e.g. per-endpoint counters). Returns whether the units were reserved."""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT units FROM quota_ledger WHERE day = ? AND scope = ?', (day, scope)).fetchone()
+            if (row[0] if row else 0) + units > limit:
+                conn.execute('ROLLBACK')
+                return False
+            for name in [scope, *(also or [])]:
+                self._add(conn, day, name, units)
+            conn.execute('COMMIT')
+            return True
+        finally:
+            conn.close()
+
+    def reserve_least_used(
+        self,
+        day: str,
+        scopes: List[str],
+        units: int,
+        limit: int,
+        skip_marked: Optional[str] = None
+    ) -> Optional[str]:
+        """Charge units to whichever of scopes has used the least and can still afford them.
+
+        With skip_marked (e.g. 'exhausted:'), scopes that have a '<skip_marked><scope>' row are
+        passed over; that check happens in the same transaction as the reservation.
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            used = self._read(conn, day, scopes)
+            if skip_marked:
+                marked = self._read(conn, day, [f"{skip_marked}{s}" for s in scopes])
+                scopes = [s for s in scopes if f"{skip_marked}{s}" not in marked]
+            candidates = [s for s in scopes if used.get(s, 0) + units <= limit]
+            if not candidates:
+                conn.execute('ROLLBACK')
+                return None
+            chosen = min(candidates, key=lambda s: used.get(s, 0))
+            self._add(conn, day, chosen, units)
+            conn.execute('COMMIT')
+            return chosen
+        finally:
+            conn.close()
+
+    def raise_to(self, day: str, scope: str, units: int):
+        """Set scope to at least units (used to mark a budget as spent)"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO quota_ledger (day, scope, units) VALUES (?, ?, ?)
+                ON CONFLICT (day, scope) DO UPDATE SET units = MAX(units, excluded.units)
+            ''', (day, scope, units))
+        finally:
+            conn.close()
+
+    def release(self, day: str, scope: str, units: int, also: Optional[List[str]] = None):
+        """Give back units reserved for a call that was never sent (never below zero)"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for name in [scope, *(also or [])]:
+                conn.execute(
+                    'UPDATE quota_ledger SET units = MAX(units - ?, 0) WHERE day = ? AND scope = ?',
+                    (units, day, name)
+                )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def usage(self, day: str, prefix: str = '') -> Dict[str, int]:
+        """{scope: units} for the day, optionally limited to scopes starting with prefix"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT scope, units FROM quota_ledger WHERE day = ? AND scope LIKE ?',
+                (day, f'{prefix}%')
+            ).fetchall()
+            return dict(rows)
+        finally:
+            conn.close()
+
+    def purge_before(self, day: str) -> int:
+        """Drop ledger rows for earlier quota days"""
+        conn = self._connect()
+        try:
+            return conn.execute('DELETE FROM quota_ledger WHERE day < ?', (day,)).rowcount
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, day: str, scope: str, units: int):
+        conn.execute('''
+            INSERT INTO quota_ledger (day, scope, units) VALUES (?, ?, ?)
+            ON CONFLICT (day, scope) DO UPDATE SET units = units + excluded.units
+        ''', (day, scope, units))
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, day: str, scopes: List[str]) -> Dict[str, int]:
+        placeholders = ','.join('?' * len(scopes))
+        rows = conn.execute(
+            f'SELECT scope, units FROM quota_ledger WHERE day = ? AND scope IN ({placeholders})',
+            (day, *scopes)
+        ).fetchall()
+        return dict(rows)
@@ -0,0 +1,163 @@
+import os
+import asyncio
+from typing import List, Dict, Any, Optional
+
+from metrics import STAGE_DURATION
+from database import comment_key
+
+
+class WriteBehindQueue:
+    """Buffers influencer, video and comment writes from async handlers and flushes them
+    to the Database in large transactions from a background task.
+
+    Records stay buffered until a flush commits them, so a failed write is retried by the next flush.
+    """
+
+    def __init__(self, database, max_batch: int = 2000, flush_interval: float = 1.0, max_pending: int = 50000):
+        self.database = database
+        # Flush early once this many records are buffered
+        self.max_batch = max_batch
+        # Otherwise flush at least this often (seconds)
+        self.flush_interval = flush_interval
+        # enqueue_* wait while this many records are unwritten (e.g. the database keeps failing)
+        self.max_pending = max(max_pending, max_batch)
+
+        # Keyed by ID so repeated writes of the same record collapse to the latest
+        self._influencers: Dict[str, Dict[str, Any]] = {}
+        self._videos: Dict[str, tuple] = {}
+        self._comments: Dict[str, tuple] = {}
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # Set after every flush attempt; producers waiting for room re-check then
+        self._flushed = asyncio.Event()
+        self._stopping = False
+        self._stats = {'flushes': 0, 'records_written': 0, 'records_inserted': 0, 'records_updated': 0, 'failed_flushes': 0}
+
+    @classmethod
+    def from_env(cls, database) -> 'WriteBehindQueue':
+        return cls(
+            database,
+            max_batch=int(os.getenv('DB_WRITE_BATCH_SIZE', '2000')),
+            flush_interval=float(os.getenv('DB_WRITE_FLUSH_SECONDS', '1.0')),
+            max_pending=int(os.getenv('DB_WRITE_MAX_PENDING', '50000'))
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._influencers) + len(self._videos) + len(self._comments)
+
+    def start(self):
+        """Start the background flusher (call from inside the running event loop)"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._flushed = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and drain everything still buffered"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if not await self.flush():
+            print(f"Write-behind queue stopped with {self.pending} unwritten records")
+
+    async def _wait_for_room(self):
+        """Backpressure: hold producers while max_pending records are still unwritten"""
+        while self.pending >= self.max_pending:
+            if self._task is None or self._task.done():
+                # No background flusher to wait for; write inline instead
+                await self.flush()
+                return
+            self._flushed.clear()
+            self._wakeup.set()
+            await self._flushed.wait()
+
+    async def enqueue_influencers(self, channels: List[Dict[str, Any]]):
+        """Queue channels (and their recent_videos); waits only when the buffer is full"""
+        await self._wait_for_room()
+        for channel in channels:
+            channel_id = channel.get('channel_id')
+            if not channel_id:
+                continue
+            self._influencers[channel_id] = channel
+            for video in channel.get('recent_videos') or []:
+                if video.get('video_id'):
+                    self._videos[video['video_id']] = (channel_id, video)
+        self._maybe_wake()
+
+    async def enqueue_videos(self, channel_id: str, videos: List[Dict[str, Any]]):
+        await self._wait_for_room()
+        for video in videos:
+            # Zeroed placeholders must not overwrite stored statistics
+            if video.get('video_id') and not video.get('stats_unavailable'):
+                self._videos[video['video_id']] = (channel_id, video)
+        self._maybe_wake()
+
+    async def enqueue_comments(self, comments_by_video: Dict[str, List[Dict[str, Any]]]):
+        await self._wait_for_room()
+        for video_id, comments in comments_by_video.items():
+            for comment in comments:
+                self._comments[comment_key(video_id, comment)] = (video_id, comment)
+        self._maybe_wake()
+
+    def _maybe_wake(self):
+        if self.pending >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Write everything buffered so far in a single transaction; returns False if the write
+        failed (the records are then kept for the next flush)"""
+        async with self._flush_lock:
+            try:
+                if not self.pending:
+                    return True
+                influencers, videos, comments = self._influencers, self._videos, self._comments
+                # Swapped out so records enqueued during the write land in fresh buffers
+                self._influencers, self._videos, self._comments = {}, {}, {}
+
+                count = len(influencers) + len(videos) + len(comments)
+                counts = None
+                try:
+                    with STAGE_DURATION.time(stage='db_write'):
+                        counts = await asyncio.to_thread(
+                            self.database.write_batch,
+                            list(influencers.values()), list(videos.values()), list(comments.values())
+                        )
+                finally:
+                    if counts is None:
+                        # Put them back without overwriting newer versions enqueued meanwhile
+                        for buffer, failed in ((self._influencers, influencers), (self._videos, videos), (self._comments, comments)):
+                            for key, record in failed.items():
+                                buffer.setdefault(key, record)
+                if counts is None:
+                    self._stats['failed_flushes'] += 1
+                    return False
+                self._stats['flushes'] += 1
+                self._stats['records_written'] += count
+                self._stats['records_inserted'] += sum(c['inserted'] for c in counts.values())
+                self._stats['records_updated'] += sum(c['updated'] for c in counts.values())
+                return True
+            finally:
+                self._flushed.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if not await self.flush():
+                    # Back off instead of retrying in a tight loop while the database is failing
+                    await asyncio.sleep(self.flush_interval)
+            except Exception as e:
+                print(f"Error in write-behind flush: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'pending': self.pending, 'running': self._task is not None and not self._task.done()}
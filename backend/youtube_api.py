@@ -1,33 +1,317 @@
 import os
+import time
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, Tuple
 import asyncio
+import json
+from collections import OrderedDict
+
+from response_cache import ResponseCache
+from quota import QuotaScheduler, QuotaExceededError, APIKeyPool, SharedCall
+from resilience import RetryPolicy, CircuitBreaker, CircuitOpenError, LatencyTracker, RETRYABLE_STATUSES
+from recording import RecordingStore, ReplayTransport
+from metrics import YOUTUBE_REQUESTS, CACHE_LOOKUPS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Decode a response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Partial-response masks: only the fields the parsers below actually read.
+# 'etag' is kept so cached entries can still be revalidated.
+FIELDS = {
+    'search_channels': 'etag,items(id/channelId,snippet(title,description,publishedAt,thumbnails/medium/url))',
+    'search_videos': (
+        'etag,nextPageToken,items(id/videoId,snippet(title,description,publishedAt,channelId,channelTitle,'
+        'thumbnails(high/url,medium/url,default/url)))'
+    ),
+    'channels_details': (
+        'etag,items(id,snippet(title,description,publishedAt,country,customUrl,thumbnails/high/url),'
+        'statistics(subscriberCount,videoCount,viewCount),contentDetails/relatedPlaylists/uploads,'
+        'brandingSettings/channel/keywords)'
+    ),
+    'channel_uploads': 'etag,items(contentDetails/relatedPlaylists/uploads)',
+    'playlist_videos': (
+        'etag,nextPageToken,items(snippet(title,description,publishedAt,thumbnails/medium/url,resourceId/videoId))'
+    ),
+    'video_stats': 'etag,items(id,statistics(viewCount,likeCount,commentCount))',
+    'comments': (
+        'etag,nextPageToken,items(id,snippet/topLevelComment/snippet('
+        'authorDisplayName,authorChannelId,textDisplay,likeCount,publishedAt))'
+    ),
+}
 
 
 class YouTubeAPI:
     """YouTube Data API v3 client for fetching channel and video data"""
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://www.googleapis.com/youtube/v3"
+    def __init__(
+        self,
+        api_key: Union[str, List[str], APIKeyPool, None],
+        cache: Optional[ResponseCache] = None,
+        quota: Optional[QuotaScheduler] = None
+    ):
+        if isinstance(api_key, APIKeyPool):
+            self.key_pool = api_key
+        else:
+            self.key_pool = APIKeyPool([api_key] if isinstance(api_key, str) else (api_key or []))
+        # Primary key, kept for callers that only check whether a key is configured
+        self.api_key = self.key_pool.keys[0] if self.key_pool.keys else None
+        # Overridable so benchmarks can target mock_youtube_server.py
+        self.base_url = os.getenv('YT_BASE_URL', "https://www.googleapis.com/youtube/v3")
         self.session = None
+        # Opt-in persistent response cache (see YT_CACHE_PATH)
+        self.cache = cache
+        # Daily budget, unit costs and rate limiting for every upstream call
+        self.quota = quota or QuotaScheduler.from_env(key_count=len(self.key_pool))
+        # Max channels whose recent videos are fetched at the same time
+        self.channel_concurrency = int(os.getenv('YT_CHANNEL_CONCURRENCY', '8'))
+        # Single-flight: identical concurrent calls share one upstream request
+        self._inflight: Dict[str, Tuple[asyncio.Future, SharedCall]] = {}
+        # Per-video single-flight plus a short memo, so a video that shows up under
+        # several keywords is only resolved once
+        self._inflight_videos: Dict[str, asyncio.Future] = {}
+        self._video_stats_memo: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.video_stats_ttl = float(os.getenv('YT_VIDEO_STATS_MEMO_SECONDS', '300'))
+        self.video_stats_memo_size = 10000
+        # Timeouts, retries, circuit breaker and optional hedging for upstream calls
+        self.timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=float(os.getenv('YT_CONNECT_TIMEOUT', '5')),
+            sock_read=float(os.getenv('YT_READ_TIMEOUT', '15'))
+        )
+        self.retry_policy = RetryPolicy.from_env()
+        self.breaker = CircuitBreaker.from_env()
+        self.latency = LatencyTracker()
+        self.hedge_requests = os.getenv('YT_HEDGE_REQUESTS', 'false').lower() in ('1', 'true', 'yes')
+        # Record mode captures responses to disk; replay mode serves them instead of the network
+        record_dir = os.getenv('YT_RECORD_DIR')
+        self.recorder = RecordingStore(record_dir) if record_dir else None
+        self.replay = ReplayTransport.from_env()
+        # Pool usage counters reported by pool_stats()
+        self._requests_in_flight = 0
+        self._peak_requests_in_flight = 0
+        self._requests_total = 0
+    
+    async def open(self):
+        """Create the pooled HTTP session up front (called from the app lifespan)"""
+        await self._get_session()
     
     async def _get_session(self):
-        """Get or create aiohttp session"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        """Get or create aiohttp session with a tuned, shared connection pool"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=int(os.getenv('YT_POOL_LIMIT', '100')),
+                limit_per_host=int(os.getenv('YT_POOL_LIMIT_PER_HOST', '32')),
+                keepalive_timeout=float(os.getenv('YT_KEEPALIVE_SECONDS', '60')),
+                ttl_dns_cache=int(os.getenv('YT_DNS_TTL_SECONDS', '300')),
+                use_dns_cache=True
+            )
+            if os.getenv('YT_HTTP_COMPRESSION', 'true').lower() in ('1', 'true', 'yes'):
+                # Google APIs only gzip responses when the User-Agent also mentions gzip
+                headers = {'Accept-Encoding': 'gzip', 'User-Agent': 'gaim-backend (gzip)'}
+            else:
+                headers = {'Accept-Encoding': 'identity'}
+            self.session = aiohttp.ClientSession(connector=connector, headers=headers)
         return self.session
     
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage, for sizing YT_POOL_LIMIT / YT_POOL_LIMIT_PER_HOST"""
+        stats: Dict[str, Any] = {
+            'open': self.session is not None and not self.session.closed,
+            'requests_in_flight': self._requests_in_flight,
+            'peak_requests_in_flight': self._peak_requests_in_flight,
+            'requests_total': self._requests_total,
+        }
+        if stats['open']:
+            connector = self.session.connector
+            stats.update({
+                'limit': connector.limit,
+                'limit_per_host': connector.limit_per_host,
+                # aiohttp does not expose these publicly; read them defensively
+                'connections_in_use': len(getattr(connector, '_acquired', ())),
+                'idle_connections': sum(len(conns) for conns in getattr(connector, '_conns', {}).values()),
+            })
+        return stats
+    
     async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make async request to YouTube API"""
+        """Make async request to YouTube API, coalescing identical in-flight calls.
+
+        The returned payload may be shared between callers and must not be mutated.
+        """
+        flight_key = ResponseCache.make_key(endpoint, params)
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            call = SharedCall()
+            pending = asyncio.ensure_future(call.run(self._fetch(endpoint, params)))
+            flight = self._inflight[flight_key] = (pending, call)
+            pending.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        pending, call = flight
+        # Runs at the highest priority of its callers and charges the first interactive one
+        call.join()
+        # Shield so one cancelled caller does not cancel the request for everyone else
+        return await asyncio.shield(pending)
+    
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform one upstream request, served from the response cache when possible"""
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(endpoint, params)
+            cached = await self.cache.get(cache_key, endpoint)
+            if cached and cached['fresh']:
+                CACHE_LOOKUPS.inc(cache='response', result='hit')
+                return cached['body']
+            if not cached:
+                CACHE_LOOKUPS.inc(cache='response', result='miss')
+        
+        # Don't charge quota for a call the open breaker would reject anyway
+        self.breaker.check()
+        await self.quota.acquire(endpoint)
+        
+        headers = {}
+        if cached and cached['etag']:
+            # Stale entry: ask YouTube to confirm it is unchanged instead of resending it
+            headers['If-None-Match'] = cached['etag']
+        
+        # Fail over across the key pool: a key rejected with quotaExceeded is retired for the day
+        while True:
+            try:
+                key = await self.key_pool.choose(self.quota.cost_of(endpoint))
+            except QuotaExceededError:
+                # No key can send it, so give back the scheduler units acquired above
+                await self.quota.refund(endpoint)
+                raise
+            request_params = {**params, 'key': key}
+            
+            try:
+                status, body, etag = await self._send_with_retries(endpoint, request_params, headers)
+            except CircuitOpenError as e:
+                if not getattr(e, 'requests_sent', 0):
+                    # The breaker opened while we waited for a rate-limit token; nothing was sent
+                    await self.quota.refund(endpoint)
+                    await self.key_pool.refund(key, self.quota.cost_of(endpoint))
+                raise
+            if status == 304 and cached:
+                CACHE_LOOKUPS.inc(cache='response', result='revalidated')
+                await self.cache.touch(cache_key)
+                return cached['body']
+            if status != 200:
+                if status == 403 and 'quotaExceeded' in body:
+                    await self.key_pool.mark_exhausted(key)
+                    if await self.key_pool.available():
+                        continue
+                    await self.quota.mark_exhausted()
+                    raise QuotaExceededError(f"YouTube API error: {status} - {body}")
+                raise Exception(f"YouTube API error: {status} - {body}")
+            data = body
+            break
+        
+        if self.cache is not None:
+            await self.cache.set(cache_key, endpoint, data, etag)
+        return data
+    
+    async def _send(self, endpoint: str, params: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any, Optional[str]]:
+        """Single GET: returns (status, parsed JSON on 200 else error text, etag)"""
+        if self.replay is not None:
+            status, body, etag = await self.replay.respond(endpoint, params)
+        else:
+            status, body, etag = await self._send_http(endpoint, params, headers)
+            if self.recorder is not None and status != 304:
+                self.recorder.save(endpoint, params, status, body)
+        YOUTUBE_REQUESTS.inc(endpoint=endpoint, status=status)
+        return status, body, etag
+    
+    async def _send_http(self, endpoint: str, params: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any, Optional[str]]:
         session = await self._get_session()
-        params['key'] = self.api_key
+        self._requests_total += 1
+        self._requests_in_flight += 1
+        self._peak_requests_in_flight = max(self._peak_requests_in_flight, self._requests_in_flight)
+        try:
+            async with session.get(f"{self.base_url}/{endpoint}", params=params, headers=headers, timeout=self.timeout) as response:
+                if response.status != 200:
+                    return response.status, await response.text(), None
+                data = _json_loads(await response.read())
+                return 200, data, response.headers.get('ETag') or data.get('etag')
+        finally:
+            self._requests_in_flight -= 1
+    
+    async def _send_hedged(self, endpoint: str, params: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any, Optional[str]]:
+        """Send a duplicate request if the first one is slower than the endpoint's p95 (1-unit endpoints only)"""
+        hedge_delay = None
+        if self.hedge_requests and self.quota.cost_of(endpoint) <= 1:
+            hedge_delay = self.latency.percentile(endpoint, 0.95)
+        if hedge_delay is None:
+            return await self._send(endpoint, params, headers)
+        
+        primary = asyncio.ensure_future(self._send(endpoint, params, headers))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
         
-        async with session.get(f"{self.base_url}/{endpoint}", params=params) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                raise Exception(f"YouTube API error: {response.status} - {error_text}")
-            return await response.json()
+        try:
+            # The duplicate is a real call and is charged like one, to the scheduler and to its key
+            await self.quota.acquire(endpoint)
+        except QuotaExceededError:
+            return await primary
+        if not await self.key_pool.charge(params['key'], self.quota.cost_of(endpoint)):
+            await self.quota.refund(endpoint)
+            return await primary
+        
+        pending = {primary, asyncio.ensure_future(self._send(endpoint, params, headers))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _send_with_retries(self, endpoint: str, params: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any, Optional[str]]:
+        """Retry timeouts, connection errors and retryable statuses with jittered backoff behind a circuit breaker"""
+        attempts = self.retry_policy.max_attempts
+        for attempt in range(attempts):
+            try:
+                self.breaker.allow()
+            except CircuitOpenError as e:
+                # Lets _fetch refund the quota when no attempt went out
+                e.requests_sent = attempt
+                raise
+            started = time.monotonic()
+            try:
+                status, body, etag = await self._send_hedged(endpoint, params, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise Exception(f"YouTube API request failed after {attempts} attempts: {e!r}")
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            
+            if status in RETRYABLE_STATUSES:
+                self.breaker.record_failure()
+                if attempt < attempts - 1:
+                    await asyncio.sleep(self.retry_policy.delay(attempt))
+                    continue
+            else:
+                self.breaker.record_success()
+                self.latency.record(endpoint, time.monotonic() - started)
+            return status, body, etag
     
     async def search_channels(self, query: str, max_results: int = 10, region_code: str = 'IN') -> List[Dict[str, Any]]:
         """Search for YouTube channels by query"""
@@ -37,7 +321,8 @@ class YouTubeAPI:
             'type': 'channel',
             'maxResults': min(max_results, 50),  # YouTube API limit
             'order': 'relevance',
-            'regionCode': region_code
+            'regionCode': region_code,
+            'fields': FIELDS['search_channels']
         }
         
         response = await self._make_request('search', params)
@@ -57,18 +342,20 @@ class YouTubeAPI:
         
         return channels
     
-    async def get_channels_details(self, channel_ids: List[str]) -> List[Dict[str, Any]]:
-        """Get detailed information for multiple channels"""
+    async def get_channels_details(self, channel_ids: List[str], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get detailed information for multiple channels, enriching them with recent videos concurrently"""
         if not channel_ids:
             return []
         
         # YouTube API allows up to 50 channels per request
         all_channels = []
+        uploads_playlists: List[str] = []
         for i in range(0, len(channel_ids), 50):
             batch = channel_ids[i:i+50]
             params = {
                 'part': 'snippet,statistics,contentDetails,brandingSettings',
-                'id': ','.join(batch)
+                'id': ','.join(batch),
+                'fields': FIELDS['channels_details']
             }
             
             response = await self._make_request('channels', params)
@@ -77,6 +364,8 @@ class YouTubeAPI:
                 snippet = item.get('snippet', {})
                 stats = item.get('statistics', {})
                 branding = item.get('brandingSettings', {})
+                # Channel keywords live under brandingSettings.channel
+                keywords_text = snippet.get('keywords') or branding.get('channel', {}).get('keywords', '')
                 
                 channel_data = {
                     'channel_id': item['id'],
@@ -89,15 +378,31 @@ class YouTubeAPI:
                     'subscriber_count': int(stats.get('subscriberCount', 0)),
                     'video_count': int(stats.get('videoCount', 0)),
                     'view_count': int(stats.get('viewCount', 0)),
-                    'keywords': snippet.get('keywords', '').split(' ') if snippet.get('keywords') else [],
+                    'keywords': keywords_text.split(' ') if keywords_text else [],
                     'topic_categories': snippet.get('topicCategories', []),
                 }
                 
-                # Get recent videos for better analysis
-                recent_videos = await self.get_channel_videos(item['id'], max_results=5)
-                channel_data['recent_videos'] = recent_videos
-                
                 all_channels.append(channel_data)
+                # contentDetails was already requested, so the uploads playlist needs no extra lookup
+                uploads_playlists.append(
+                    item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads', '')
+                )
+        
+        # Get recent videos for better analysis, several channels at a time
+        semaphore = asyncio.Semaphore(max_concurrency or self.channel_concurrency)
+        
+        async def fetch_recent(channel_data: Dict[str, Any], playlist_id: str) -> List[Dict[str, Any]]:
+            if not playlist_id:
+                return []
+            async with semaphore:
+                return await self._get_playlist_videos(playlist_id, max_results=5, channel_id=channel_data['channel_id'])
+        
+        recent = await asyncio.gather(*(
+            fetch_recent(channel_data, playlist_id)
+            for channel_data, playlist_id in zip(all_channels, uploads_playlists)
+        ))
+        for channel_data, recent_videos in zip(all_channels, recent):
+            channel_data['recent_videos'] = recent_videos
         
         return all_channels
     
@@ -107,7 +412,8 @@ class YouTubeAPI:
             # First, get the uploads playlist ID
             params = {
                 'part': 'contentDetails',
-                'id': channel_id
+                'id': channel_id,
+                'fields': FIELDS['channel_uploads']
             }
             channel_response = await self._make_request('channels', params)
             
@@ -115,60 +421,122 @@ class YouTubeAPI:
                 return []
             
             uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            
-            # Get videos from the uploads playlist
+        except Exception as e:
+            print(f"Error fetching videos for channel {channel_id}: {e}")
+            return []
+        
+        return await self._get_playlist_videos(uploads_playlist_id, max_results=max_results, channel_id=channel_id)
+    
+    async def _get_playlist_videos(self, playlist_id: str, max_results: int = 10, channel_id: str = '') -> List[Dict[str, Any]]:
+        """Get videos (with statistics) from an uploads playlist"""
+        try:
             params = {
-                'part': 'snippet,contentDetails',
-                'playlistId': uploads_playlist_id,
-                'maxResults': min(max_results, 50)
+                'part': 'snippet',
+                'playlistId': playlist_id,
+                'maxResults': min(max_results, 50),
+                'fields': FIELDS['playlist_videos']
             }
             videos_response = await self._make_request('playlistItems', params)
             
-            videos = []
-            for item in videos_response.get('items', []):
-                snippet = item.get('snippet', {})
-                video_id = snippet.get('resourceId', {}).get('videoId')
-                
-                if video_id:
-                    # Get video statistics
-                    video_stats = await self.get_video_details(video_id)
-                    videos.append({
-                        'video_id': video_id,
-                        'title': snippet.get('title', ''),
-                        'description': snippet.get('description', ''),
-                        'published_at': snippet.get('publishedAt', ''),
-                        'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                        'view_count': video_stats.get('view_count', 0),
-                        'like_count': video_stats.get('like_count', 0),
-                        'comment_count': video_stats.get('comment_count', 0)
-                    })
+            items = [
+                item for item in videos_response.get('items', [])
+                if item.get('snippet', {}).get('resourceId', {}).get('videoId')
+            ]
+            # Resolve statistics for the whole page in one batched call
+            stats_by_id = await self.get_videos_details(
+                [item['snippet']['resourceId']['videoId'] for item in items]
+            )
             
-            return videos
+            return [
+                self._parse_playlist_video(item, stats_by_id.get(item['snippet']['resourceId']['videoId'], {}))
+                for item in items
+            ]
         except Exception as e:
-            print(f"Error fetching videos for channel {channel_id}: {e}")
+            print(f"Error fetching videos for channel {channel_id or playlist_id}: {e}")
             return []
     
+    @staticmethod
+    def _parse_playlist_video(item: Dict[str, Any], video_stats: Dict[str, Any]) -> Dict[str, Any]:
+        snippet = item['snippet']
+        return {
+            'video_id': snippet['resourceId']['videoId'],
+            'title': snippet.get('title', ''),
+            'description': snippet.get('description', ''),
+            'published_at': snippet.get('publishedAt', ''),
+            'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+            'view_count': video_stats.get('view_count', 0),
+            'like_count': video_stats.get('like_count', 0),
+            'comment_count': video_stats.get('comment_count', 0)
+        }
+    
     async def get_video_details(self, video_id: str) -> Dict[str, Any]:
         """Get details for a specific video"""
-        params = {
-            'part': 'statistics',
-            'id': video_id
-        }
+        details = await self.get_videos_details([video_id])
+        return details.get(video_id, {})
+    
+    async def get_videos_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for many videos, keyed by video ID (50 IDs per request)"""
+        # Preserve first-seen order while dropping duplicates
+        unique_ids = list(dict.fromkeys(vid for vid in video_ids if vid))
         
-        response = await self._make_request('videos', params)
+        details: Dict[str, Dict[str, Any]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        to_fetch: List[str] = []
+        now = time.monotonic()
+        for vid in unique_ids:
+            memo = self._video_stats_memo.get(vid)
+            if memo and now - memo[0] <= self.video_stats_ttl:
+                details[vid] = memo[1]
+            elif vid in self._inflight_videos:
+                # Another caller is already resolving this video
+                waiting[vid] = self._inflight_videos[vid]
+            else:
+                to_fetch.append(vid)
         
-        if response.get('items'):
-            stats = response['items'][0].get('statistics', {})
-            return {
-                'view_count': int(stats.get('viewCount', 0)),
-                'like_count': int(stats.get('likeCount', 0)),
-                'comment_count': int(stats.get('commentCount', 0))
-            }
-        return {}
-
-    async def search_videos(self, query: str, max_results: int = 10, order: str = 'relevance', region_code: str = 'IN', language: str = 'English', video_duration: str = 'any') -> List[Dict[str, Any]]:
-        """Search for YouTube videos by query and return basic info with stats - with language and duration filtering"""
+        loop = asyncio.get_running_loop()
+        owned = {vid: loop.create_future() for vid in to_fetch}
+        self._inflight_videos.update(owned)
+        try:
+            for i in range(0, len(to_fetch), 50):
+                batch = to_fetch[i:i+50]
+                params = {
+                    'part': 'statistics',
+                    'id': ','.join(batch),
+                    'fields': FIELDS['video_stats']
+                }
+                
+                response = await self._make_request('videos', params)
+                
+                for item in response.get('items', []):
+                    stats = item.get('statistics', {})
+                    details[item['id']] = {
+                        'view_count': int(stats.get('viewCount', 0)),
+                        'like_count': int(stats.get('likeCount', 0)),
+                        'comment_count': int(stats.get('commentCount', 0))
+                    }
+                    self._remember_video_stats(item['id'], details[item['id']])
+        finally:
+            # Waiters get None for videos that were not resolved (deleted, or the call failed)
+            for vid, future in owned.items():
+                if not future.done():
+                    future.set_result(details.get(vid))
+                self._inflight_videos.pop(vid, None)
         
+        for vid, future in waiting.items():
+            stats = await future
+            if stats is not None:
+                details[vid] = stats
+        return details
+    
+    def _remember_video_stats(self, video_id: str, stats: Dict[str, Any]):
+        self._video_stats_memo[video_id] = (time.monotonic(), stats)
+        self._video_stats_memo.move_to_end(video_id)
+        while len(self._video_stats_memo) > self.video_stats_memo_size:
+            self._video_stats_memo.popitem(last=False)
+
+    @staticmethod
+    def _search_video_params(query: str, max_results: int, order: str, region_code: str, language: str, video_duration: str) -> Dict[str, Any]:
+        """Build search.list params for a video search with language and duration filtering"""
         # Map language to YouTube language codes
         language_codes = {
             'English': 'en',
@@ -194,6 +562,7 @@ class YouTubeAPI:
             'order': order,
             'regionCode': region_code,  # Set to India by default
             'relevanceLanguage': relevance_language,  # Language-specific filtering
+            'fields': FIELDS['search_videos']
         }
         
         # Add duration filter if specified
@@ -201,34 +570,67 @@ class YouTubeAPI:
         if video_duration in ['short', 'medium', 'long', 'any']:
             if video_duration != 'any':
                 params['videoDuration'] = video_duration
+        return params
+    
+    @staticmethod
+    def _parse_search_video(item: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        snippet = item['snippet']
+        
+        # Get high quality thumbnail if available
+        thumbnails = snippet.get('thumbnails', {})
+        thumbnail_url = (
+            thumbnails.get('high', {}).get('url', '') or
+            thumbnails.get('medium', {}).get('url', '') or
+            thumbnails.get('default', {}).get('url', '')
+        )
         
+        return {
+            'video_id': item['id']['videoId'],
+            'title': snippet.get('title', ''),
+            'description': snippet.get('description', ''),
+            'published_at': snippet.get('publishedAt', ''),
+            'thumbnail': thumbnail_url,
+            'channel_id': snippet.get('channelId', ''),
+            'channel_title': snippet.get('channelTitle', ''),
+            **stats
+        }
+    
+    async def search_videos(self, query: str, max_results: int = 10, order: str = 'relevance', region_code: str = 'IN', language: str = 'English', video_duration: str = 'any') -> List[Dict[str, Any]]:
+        """Search for YouTube videos by query and return basic info with stats - with language and duration filtering"""
+        params = self._search_video_params(query, max_results, order, region_code, language, video_duration)
         response = await self._make_request('search', params)
 
-        videos: List[Dict[str, Any]] = []
-        for item in response.get('items', []):
-            video_id = item['id']['videoId']
-            snippet = item['snippet']
-            stats = await self.get_video_details(video_id)
-            
-            # Get high quality thumbnail if available
-            thumbnails = snippet.get('thumbnails', {})
-            thumbnail_url = (
-                thumbnails.get('high', {}).get('url', '') or
-                thumbnails.get('medium', {}).get('url', '') or
-                thumbnails.get('default', {}).get('url', '')
-            )
-            
-            videos.append({
-                'video_id': video_id,
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'thumbnail': thumbnail_url,
-                'channel_id': snippet.get('channelId', ''),
-                'channel_title': snippet.get('channelTitle', ''),
-                **stats
-            })
-        return videos
+        items = response.get('items', [])
+        # One videos.list call for the whole result page instead of one per video
+        stats_by_id = await self._search_stats(items)
+        return [self._parse_search_video(item, stats_by_id.get(item['id']['videoId'], {})) for item in items]
+
+    async def _search_stats(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Stats for a page of search results. The 100-unit search is already paid for, so if the
+        quota runs out before the 1-unit videos.list call, the results are kept with zeroed stats
+        and marked stats_unavailable (those are not written to the database)."""
+        video_ids = [item['id']['videoId'] for item in items]
+        try:
+            return await self.get_videos_details(video_ids)
+        except QuotaExceededError as e:
+            print(f"Returning search results without statistics: {e}")
+            unavailable = {'view_count': 0, 'like_count': 0, 'comment_count': 0, 'stats_unavailable': True}
+            return {vid: unavailable for vid in video_ids}
+
+    @staticmethod
+    def _parse_comment(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        top = item.get('snippet', {}).get('topLevelComment', {}).get('snippet', {})
+        if not top:
+            return None
+        return {
+            # A thread's ID is its top-level comment's ID
+            'comment_id': item.get('id', ''),
+            'author': top.get('authorDisplayName', ''),
+            'author_channel_id': top.get('authorChannelId', {}).get('value', ''),
+            'text': top.get('textDisplay', ''),
+            'like_count': int(top.get('likeCount', 0)),
+            'published_at': top.get('publishedAt', '')
+        }
 
     async def get_video_comments(self, video_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
         """Fetch top-level comments for a video (basic fields)"""
@@ -237,29 +639,152 @@ class YouTubeAPI:
             'videoId': video_id,
             'maxResults': min(max_results, 100),
             'order': 'relevance',
-            'textFormat': 'plainText'
+            'textFormat': 'plainText',
+            'fields': FIELDS['comments']
         }
         try:
             response = await self._make_request('commentThreads', params)
             comments: List[Dict[str, Any]] = []
             for item in response.get('items', []):
-                top = item.get('snippet', {}).get('topLevelComment', {}).get('snippet', {})
-                if top:
-                    comments.append({
-                        'author': top.get('authorDisplayName', ''),
-                        'author_channel_id': top.get('authorChannelId', {}).get('value', ''),
-                        'text': top.get('textDisplay', ''),
-                        'like_count': int(top.get('likeCount', 0)),
-                        'published_at': top.get('publishedAt', '')
-                    })
+                comment = self._parse_comment(item)
+                if comment:
+                    comments.append(comment)
             return comments
         except Exception as e:
             print(f"Error fetching comments for video {video_id}: {e}")
             return []
     
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        page_size: int,
+        max_items: Optional[int] = None,
+        prefetch: Optional[bool] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Follow nextPageToken lazily, yielding one page of raw items at a time.
+
+        While the caller works on a page, the next one is already being fetched. Prefetching
+        defaults to on only for 1-unit endpoints, so stopping early never wastes a 100-unit search.
+        """
+        if prefetch is None:
+            prefetch = self.quota.cost_of(endpoint) <= 1
+        
+        def page_params(page_token: Optional[str], remaining: Optional[int]) -> Dict[str, Any]:
+            size = page_size if remaining is None else min(page_size, remaining)
+            request_params = {**params, 'maxResults': size}
+            if page_token:
+                request_params['pageToken'] = page_token
+            return request_params
+        
+        remaining = max_items
+        next_page = asyncio.ensure_future(self._make_request(endpoint, page_params(None, remaining)))
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_page = None
+                
+                items = response.get('items', [])
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+                
+                token = response.get('nextPageToken')
+                has_more = bool(token) and bool(items) and (remaining is None or remaining > 0)
+                if has_more and prefetch:
+                    next_page = asyncio.ensure_future(self._make_request(endpoint, page_params(token, remaining)))
+                
+                if items:
+                    yield items
+                
+                if has_more and not prefetch:
+                    next_page = asyncio.ensure_future(self._make_request(endpoint, page_params(token, remaining)))
+        finally:
+            # The caller stopped early: drop the page fetched ahead
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+    
+    async def iter_search_videos(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        order: str = 'relevance',
+        region_code: str = 'IN',
+        language: str = 'English',
+        video_duration: str = 'any',
+        prefetch: Optional[bool] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield search results (with stats) across pages until max_results or the caller stops"""
+        params = self._search_video_params(query, 50, order, region_code, language, video_duration)
+        async for items in self._iter_pages('search', params, 50, max_results, prefetch):
+            stats_by_id = await self._search_stats(items)
+            for item in items:
+                yield self._parse_search_video(item, stats_by_id.get(item['id']['videoId'], {}))
+    
+    async def iter_channel_videos(self, channel_id: str, max_results: Optional[int] = None, prefetch: Optional[bool] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a channel's uploads (newest first, with stats) across pages"""
+        params = {
+            'part': 'contentDetails',
+            'id': channel_id,
+            'fields': FIELDS['channel_uploads']
+        }
+        channel_response = await self._make_request('channels', params)
+        if not channel_response.get('items'):
+            return
+        uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        
+        params = {
+            'part': 'snippet',
+            'playlistId': uploads_playlist_id,
+            'fields': FIELDS['playlist_videos']
+        }
+        async for items in self._iter_pages('playlistItems', params, 50, max_results, prefetch):
+            items = [item for item in items if item.get('snippet', {}).get('resourceId', {}).get('videoId')]
+            stats_by_id = await self.get_videos_details(
+                [item['snippet']['resourceId']['videoId'] for item in items]
+            )
+            for item in items:
+                yield self._parse_playlist_video(item, stats_by_id.get(item['snippet']['resourceId']['videoId'], {}))
+    
+    async def iter_video_comments(
+        self,
+        video_id: str,
+        max_results: Optional[int] = None,
+        order: str = 'relevance',
+        prefetch: Optional[bool] = None,
+        since: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield top-level comments for a video across pages.
+
+        With since (a publishedAt timestamp), comments come newest first and iteration stops at
+        the first one older than since, so only comments posted after an earlier harvest are fetched.
+        """
+        if since is not None:
+            order = 'time'
+            if prefetch is None:
+                # The first page usually reaches the watermark; don't pay for a second one
+                prefetch = False
+        params = {
+            'part': 'snippet',
+            'videoId': video_id,
+            'order': order,
+            'textFormat': 'plainText',
+            'fields': FIELDS['comments']
+        }
+        async for items in self._iter_pages('commentThreads', params, 100, max_results, prefetch):
+            for item in items:
+                comment = self._parse_comment(item)
+                if not comment:
+                    continue
+                # Equal timestamps are still yielded; the comment ID dedupes them on write
+                if since is not None and comment['published_at'] < since:
+                    return
+                yield comment
+    
     async def close(self):
         """Close the aiohttp session"""
         if self.session:
             await self.session.close()
+            self.session = None
 
 
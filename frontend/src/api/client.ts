@@ -46,8 +46,37 @@ export interface RankedChannel {
 export interface SelectInfluencersResponse {
   ranked: RankedChannel[]
   keywords_used: string[]
+  cached?: boolean
+  cached_at?: string
 }
 
+export interface SelectInfluencersPayload {
+  campaign_text: string
+  seed_keywords: string[]
+  keywords?: string[]
+  top_videos_per_keyword: number
+  past_videos_to_check: number
+  top_n: number
+  use_network: boolean
+  max_comments_per_video: number
+  use_cache?: boolean
+}
+
+export type SelectInfluencersEvent =
+  | { event: 'keywords'; keywords: string[] }
+  | {
+      event: 'keyword'
+      keyword: string
+      completed: number
+      total: number
+      error: string | null
+      new_channels: { channel_id: string; title: string }[]
+    }
+  | { event: 'provisional'; stage: 'search' | 'match'; ranked: RankedChannel[] }
+  | { event: 'stage'; stage: 'channels' | 'comments'; channels: number }
+  | { event: 'final'; status: number; result: SelectInfluencersResponse & { message?: string } }
+  | { event: 'error'; message: string }
+
 const jsonFetch = async <T>(url: string, options?: RequestInit): Promise<T> => {
   const res = await fetch(url, {
     headers: { 'Content-Type': 'application/json' },
@@ -67,14 +96,48 @@ export const api = {
   searchTopVideos: (payload: { keywords: string[]; top_videos_per_keyword: number; order?: string; video_duration?: string; languages?: string[] }) =>
     jsonFetch<SearchTopVideosResponse>('/api/search-top-videos', { method: 'POST', body: JSON.stringify(payload) }),
 
-  selectInfluencers: (payload: {
-    campaign_text: string
-    seed_keywords: string[]
-    keywords?: string[]
-    top_videos_per_keyword: number
-    past_videos_to_check: number
-    top_n: number
-    use_network: boolean
-    max_comments_per_video: number
-  }) => jsonFetch<SelectInfluencersResponse>('/api/select-influencers', { method: 'POST', body: JSON.stringify(payload) }),
+  selectInfluencers: (payload: SelectInfluencersPayload) => jsonFetch<SelectInfluencersResponse>('/api/select-influencers', { method: 'POST', body: JSON.stringify(payload) }),
+
+  // Streams NDJSON progress events to onEvent and resolves with the final ranking
+  selectInfluencersStream: async (
+    payload: SelectInfluencersPayload,
+    onEvent: (event: SelectInfluencersEvent) => void,
+  ): Promise<SelectInfluencersResponse> => {
+    const res = await fetch('/api/select-influencers/stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload),
+    })
+    if (!res.ok || !res.body) {
+      const text = await res.text()
+      throw new Error(text || `Request failed: ${res.status}`)
+    }
+
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let final: SelectInfluencersResponse | null = null
+    const handle = (line: string): SelectInfluencersResponse | null => {
+      if (!line.trim()) return null
+      const event = JSON.parse(line) as SelectInfluencersEvent
+      onEvent(event)
+      if (event.event === 'error') throw new Error(event.message)
+      if (event.event !== 'final') return null
+      if (event.status !== 200) throw new Error(event.result.message || `Request failed: ${event.status}`)
+      return event.result
+    }
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      const lines = buffer.split('\n')
+      buffer = lines.pop() ?? ''
+      for (const line of lines) final = handle(line) ?? final
+    }
+    final = handle(buffer + decoder.decode()) ?? final
+
+    if (!final) throw new Error('Stream ended before the final ranking')
+    return final
+  },
 }
@@ -16,6 +16,8 @@ interface CampaignPanelProps {
   suggestedKeywords: string[]
   selectedKeywords: string[]
   setSelectedKeywords: (kw: string[]) => void
+  // Live status line while influencers are being ranked (streamed from the backend)
+  progress?: string | null
 }
 
 const CampaignPanel = ({
@@ -25,6 +27,7 @@ const CampaignPanel = ({
   suggestedKeywords,
   selectedKeywords,
   setSelectedKeywords,
+  progress,
 }: CampaignPanelProps) => {
   const [campaignText, setCampaignText] = useState('')
   const [seedKeywordsInput, setSeedKeywordsInput] = useState('')
@@ -281,6 +284,9 @@ const CampaignPanel = ({
                 {loading === 'select' ? '⚡ Ranking Influencers...' : '⚡ Find Best Influencers'}
               </button>
             </div>
+            {loading === 'select' && progress && (
+              <p className="mt-3 text-sm text-gray-600" aria-live="polite">{progress}</p>
+            )}
           </div>
         )}
 
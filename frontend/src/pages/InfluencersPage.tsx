@@ -51,6 +51,7 @@ const InfluencersPage = () => {
   const [suggestedKeywords, setSuggestedKeywords] = useState<string[]>([])
   const [selectedKeywords, setSelectedKeywords] = useState<string[]>([])
   const [ranked, setRanked] = useState<RankedChannel[]>([])
+  const [selectProgress, setSelectProgress] = useState<string | null>(null)
   const [topVideos, setTopVideos] = useState<Record<string, Video[]> | null>(null)
 
   useEffect(() => {
@@ -144,21 +145,38 @@ const InfluencersPage = () => {
           setTopVideos(result.results)
         }}
         onSelectInfluencers={async ({ campaignText, seedKeywords, keywords, topVideosPerKeyword, pastVideosToCheck, topN, useNetwork, maxCommentsPerVideo }) => {
-          const result = await api.selectInfluencers({
-            campaign_text: campaignText,
-            seed_keywords: seedKeywords,
-            keywords,
-            top_videos_per_keyword: topVideosPerKeyword,
-            past_videos_to_check: pastVideosToCheck,
-            top_n: topN,
-            use_network: useNetwork,
-            max_comments_per_video: maxCommentsPerVideo,
-          })
-          setRanked(result.ranked)
+          setSelectProgress('Preparing keywords...')
+          try {
+            const result = await api.selectInfluencersStream({
+              campaign_text: campaignText,
+              seed_keywords: seedKeywords,
+              keywords,
+              top_videos_per_keyword: topVideosPerKeyword,
+              past_videos_to_check: pastVideosToCheck,
+              top_n: topN,
+              use_network: useNetwork,
+              max_comments_per_video: maxCommentsPerVideo,
+            }, (event) => {
+              // Show provisional rankings as soon as they arrive
+              if (event.event === 'keyword') {
+                setSelectProgress(`Searched ${event.completed}/${event.total} keywords (${event.keyword})`)
+              } else if (event.event === 'provisional') {
+                setRanked(event.ranked)
+              } else if (event.event === 'stage') {
+                setSelectProgress(event.stage === 'channels'
+                  ? `Loading details for ${event.channels} channels...`
+                  : `Reading comments for ${event.channels} top candidates...`)
+              }
+            })
+            setRanked(result.ranked)
+          } finally {
+            setSelectProgress(null)
+          }
         }}
         suggestedKeywords={suggestedKeywords}
         selectedKeywords={selectedKeywords}
         setSelectedKeywords={setSelectedKeywords}
+        progress={selectProgress}
       />
 
       <main className="flex-1">